@@ -1,18 +1,18 @@
 import discord
-import aiohttp
-import requests
-from bs4 import BeautifulSoup # parsing wise's currency converter
 import re
 import os
-import json
 import sys
 from pathlib import Path
 import asyncio  # for background tasks
-import pytz  # Adding this for timezone handling
 import time
+import math
+import io
+import shlex
+import sqlite3
 start_time = time.time()
 from discord import app_commands
 from datetime import datetime  # Adding this for date and time handling
+from datetime import time as dt_time
 from data_mappings import (
     timezones_dict,
     USER_TIMEZONE_MAPPING,
@@ -21,6 +21,24 @@ from data_mappings import (
     SUPPORTED_CURRENCIES,
     USER_LOCATION_MAPPING,
 )
+from fx_rates import get_exchange_rate, RateMatrix
+from http_session import close_session
+from tz_index import TimezoneIndex
+from autocomplete import LocationCompleter
+from reminders import ReminderScheduler
+from chat_logger import ChatLogWriter
+from bot_stats import StatsSnapshotter
+from desc_store import DescriptionStore, JsonDescriptionBackend, SqliteDescriptionBackend
+from audit_log import AuditForwarder
+from weather import WeatherClient, normalize_location
+from translate import Translator
+from admin_router import CommandRouter
+from channel_export import ChannelExporter, GuildArchiver, upload_chunk_bytes
+from message_prune import PruneJob
+from chat_search import ChatSearchIndex
+from member_index import MemberIndex, MemberResolver, members_csv, render_rows
+from command_sync import CommandSyncer
+import metrics
 from readme_content import (
     sections,
     get_currency_list_embed,
@@ -36,15 +54,71 @@ load_dotenv()
 import os
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
+FX_BASE_CURRENCY = os.getenv("FX_BASE_CURRENCY", "USD")
+FX_CACHE_TTL = int(os.getenv("FX_CACHE_TTL", "900"))  # seconds before the rate matrix is re-scraped
+STATS_INTERVAL = int(os.getenv("STATS_INTERVAL", "30"))  # seconds between bot_stats.json snapshots
+DESC_BACKEND = os.getenv("DESC_BACKEND", "json")  # "json" or "sqlite"
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))  # seconds current conditions are reused
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # prometheus /metrics endpoint, 0 turns it off
+COMMAND_SYNC = os.getenv("COMMAND_SYNC", "global")  # "global" or "dev" (TEST_GUILD_ID only)
 
 
-command_counter = 0
-active_users = set()
+# built once at startup, replaces the nested walks over timezones_dict
+tz_index = TimezoneIndex(timezones_dict)
 
 
+def build_location_completer():
+    completer = LocationCompleter()
+    for entry in tz_index.entries:
+        completer.add(entry.city, f"{entry.city.title()} ({entry.abbreviation.upper()}) — {entry.country.title()}", entry.city)
+        completer.add(entry.abbreviation, f"{entry.abbreviation.upper()} — {entry.city.title()}", entry.abbreviation)
+    for country in timezones_dict:
+        completer.add(country, country.title(), country)
+    for abbreviation, name in COUNTRY_ABBREVIATIONS.items():
+        completer.add(abbreviation, f"{abbreviation.upper()} — {name}", abbreviation)
+    return completer
+
+
+# autocomplete indexes for /time, /timeconvert and /weather
+time_completer = build_location_completer()
+weather_completer = build_location_completer()
+for _, saved_location in USER_LOCATION_MAPPING.values():
+    weather_completer.add(saved_location)
+
+# repeated phrases are answered from an LRU instead of another scrape
+translator = Translator(max_entries=1024)
+
+# shared weather client, geocodes are cached on disk forever and conditions for a few minutes
+weather_client = WeatherClient(WEATHER_API_KEY, geocode_path="geocode_cache.json", ttl=WEATHER_CACHE_TTL)
+
+
+def add_geocode_suggestion(query, place):
+    weather_completer.add(query, f"{place['name']}, {place['country']}", query)
+
+
+for query, place in weather_client.geocodes.items():
+    add_geocode_suggestion(query, place)
+weather_client.geocodes.on_add = add_geocode_suggestion
+
+
+def location_choices(completer, current):
+    # only complete the last entry of a comma separated list
+    head, sep, tail = current.rpartition(",")
+    prefix = f"{head.strip()}, " if sep else ""
+    return [
+        app_commands.Choice(name=name, value=prefix + value)
+        for name, value in completer.suggest(tail)
+        if len(prefix + value) <= 100
+    ]
+
+
+
+# lines are queued and appended to chat_logs.txt in batches by a background task
+chat_log = ChatLogWriter("chat_logs.txt")
+
 
 def log_command_to_file(user, content, guild=None, channel=None):
-    log_file = "chat_logs.txt"
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     guild_name = guild.name if guild else "DM"
 
@@ -55,8 +129,7 @@ def log_command_to_file(user, content, guild=None, channel=None):
     else:
         channel_name = "Unknown"
 
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] [{guild_name}#{channel_name}] {user}: {content}\n")
+    chat_log.write(f"[{timestamp}] [{guild_name}#{channel_name}] {user}: {content}\n")
 
 
 # Function to build an embed from a section in help file
@@ -101,67 +174,50 @@ class HelpView(discord.ui.View):
         await interaction.response.edit_message(embed=embed, view=self)
 
 DESC_FILE = Path("user_descriptions.json")
+DESC_DB = Path("user_descriptions.db")
 
-def load_descriptions():
-    if DESC_FILE.exists():
-        with open(DESC_FILE, "r") as f:
-            return json.load(f)
-    return {}
+# descriptions are read from memory, edits are written behind to json (or sqlite)
+if DESC_BACKEND == "sqlite":
+    descriptions = DescriptionStore(SqliteDescriptionBackend(DESC_DB, import_from=DESC_FILE))
+else:
+    descriptions = DescriptionStore(JsonDescriptionBackend(DESC_FILE))
 
-def save_descriptions(data):
-    with open(DESC_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-# web scrapper stuff to fetch conversion info 
-def get_exchange_rate(from_currency, to_currency):
-    url = f"https://wise.com/us/currency-converter/{from_currency.lower()}-to-{to_currency.lower()}-rate?amount=1000"
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract the exchange rate
-        rate_text = soup.find('span', class_='text-success')
-        rate = float(re.search(r"\d+\.\d+", rate_text.text.strip()).group()) if rate_text else None
-
-        # Extract the 30-day high, low, average, and change — deprecated
-        table_rows = soup.select('table tr')
-        high_30 = float(table_rows[1].find_all('td')[1].text)
-        low_30 = float(table_rows[2].find_all('td')[1].text)
-        average_30 = float(table_rows[3].find_all('td')[1].text)
-        change_30 = table_rows[4].find_all('td')[1].text.strip()
-        
-        return rate, high_30, low_30, average_30, change_30, url
-    else:
-        print(f"Failed to retrieve page. Status code: {response.status_code}")
-        return None, None, None, None, None, None
-    
 # time function
 def get_current_time(location):
 
     # Normalizing input for case-insensitive matching
     location = location.strip().casefold()
 
+    # Country or abbreviation first, then the first matching city or abbreviation
+    entries = tz_index.resolve(location)
+    if not entries:
+        return None
+
     results = []
+    for entry in entries:
+        city_time = datetime.now(entry.tzinfo)
+        results.append(f"The current time is **{city_time.strftime('%I:%M %p')}** in {entry.city.title()}, {entry.country.upper()}. {entry.gmt_offset}")
+    return results
 
-    # Check if entered location is a country or abbreviation 
-    if location in timezones_dict:
-        for city, abbreviation, timezone, gmt_offset in timezones_dict[location]:
-            tz = pytz.timezone(timezone)
-            city_time = datetime.now(tz)
-            results.append(f"The current time is **{city_time.strftime('%I:%M %p')}** in {city.title()}, {location.upper()}. {gmt_offset}")
-        return results
-
-    # Check for a matching city or abbreviation
-    for country, cities in timezones_dict.items():
-        for city, abbreviation, timezone, gmt_offset in cities:
-            if location in {city, abbreviation}:
-                tz = pytz.timezone(timezone)
-                city_time = datetime.now(tz)
-                results.append(f"The current time is **{city_time.strftime('%I:%M %p')}** in {city.title()}, {country.upper()}. {gmt_offset}")
-                return results
 
-    return None
+# parses 5pm / 5:34pm / 17:00 / 1700, returns the naive time and whether it was 12-hour
+def parse_time(time_str):
+    time_str = time_str.strip().lower()
+
+    # Check if time is in 12-hour or 24-hour format and parse accordingly
+    format_12hr = 'am' in time_str or 'pm' in time_str
+    if format_12hr:  # 12-hour format
+        try:
+            naive_time = datetime.strptime(time_str, "%I:%M%p")  # 5:34pm
+        except ValueError:
+            naive_time = datetime.strptime(time_str, "%I%p")  # 5pm
+    else:  # 24-hour format (e.g., 17:00, 1700)
+        try:
+            naive_time = datetime.strptime(time_str, "%H:%M")  # 17:00
+        except ValueError:
+            naive_time = datetime.strptime(time_str, "%H%M")  # 1700
+
+    return naive_time, format_12hr
 
 
 # convert time function, fixed misalignment of names
@@ -172,68 +228,79 @@ def convert_time(time_str, from_location, to_location):
     to_location = to_location.strip().casefold()
 
     # Gathering entries for source and destination locations
-    from_entries = [entry for country, cities in timezones_dict.items() for entry in cities if from_location in {country, entry[0], entry[1]}]
-    to_entries = [entry for country, cities in timezones_dict.items() for entry in cities if to_location in {country, entry[0], entry[1]}]
+    from_entries = tz_index.find(from_location)
+    to_entries = tz_index.find(to_location)
 
     if not from_entries or not to_entries:
         return [f"**Error:** Could not find timezone information for one of the locations."]
 
+    naive_time, format_12hr = parse_time(time_str)
+
+    # Only takes the first city from each destination timezone
+    first_by_timezone = {}
+    for entry in to_entries:
+        first_by_timezone.setdefault(entry.timezone, entry)
+    to_entries = list(first_by_timezone.values())
+
     converted_times = []
-    
-    # Group destination cities by timezone
-    cities_by_timezone = {}
-    for to_city, _, to_tz, gmt_offset in to_entries:
-        if to_tz not in cities_by_timezone:
-            cities_by_timezone[to_tz] = []
-        cities_by_timezone[to_tz].append((to_city, gmt_offset))
-
-    for from_city, _, from_tz, _ in from_entries:
-        tz = pytz.timezone(from_tz)
-        current_date = datetime.now()  # Get current date
-
-        # Parse the input time
-        time_str = time_str.strip().lower()
-
-        # Check if time is in 12-hour or 24-hour format and parse accordingly
-        if 'am' in time_str or 'pm' in time_str:  # 12-hour format
-            try:
-                naive_time = datetime.strptime(time_str, "%I:%M%p")  # 5:34pm
-            except ValueError:
-                naive_time = datetime.strptime(time_str, "%I%p")  # 5pm
-        else:  # 24-hour format (e.g., 17:00, 1700)
-            try:
-                naive_time = datetime.strptime(time_str, "%H:%M")  # 17:00
-            except ValueError:
-                naive_time = datetime.strptime(time_str, "%H%M")  # 1700
-
-        # Replacing current date to preserve year, month, day while parsing time
-        naive_time = naive_time.replace(year=current_date.year, month=current_date.month, day=current_date.day)
-
-        aware_time = tz.localize(naive_time)  # Localize to source timezone
-
-        for to_tz, cities in cities_by_timezone.items():
-            # Only takes the first city from each timezone group
-            to_city, gmt_offset = cities[0]
-            target_tz = pytz.timezone(to_tz)
-            converted_time = aware_time.astimezone(target_tz)  # Convert to target timezone
-
-            # Format the time in HH:MM format (24-hour time) for consistency
-            from_time = aware_time.strftime('%H:%M')  
-            to_time = converted_time.strftime('%H:%M')  
-
-            # Check if the original time format was 12-hour (contains 'am' or 'pm')
-            if 'am' in time_str or 'pm' in time_str:
-                # If the time was in 12-hour format, respond in 12-hour format
-                from_time = format_time(aware_time, format_12hr=True)
-                to_time = format_time(converted_time, format_12hr=True)
-            else:
-                # If the time was in 24-hour format, keep the 24-hour format
-                from_time = format_time(aware_time, format_12hr=False)
-                to_time = format_time(converted_time, format_12hr=False)
+    from_time = format_time(naive_time, format_12hr=format_12hr)
+
+    for from_entry in from_entries:
+        for to_entry, hour, minute, _ in tz_index.convert_many(naive_time, from_entry, to_entries):
+            to_time = format_time(dt_time(hour, minute), format_12hr=format_12hr)
+            converted_times.append(f"**{from_time}** in {from_entry.city.title()} is **{to_time}** in {to_entry.city.title()}, {to_entry.gmt_offset}")
+
+    return list(dict.fromkeys(converted_times))
+
+
+# batch conversion: one source time to any mix of locations, abbreviations and users
+# destinations are strings (city/abbreviation/country or <@mention>) or USER_TIMEZONE_MAPPING ids
+def convert_time_many(time_str, from_location, destinations):
+    from_entries = tz_index.find(from_location)
+    if not from_entries:
+        return None, []
+
+    labels = []
+    to_entries = []
+    unresolved = []
+    for destination in destinations:
+        user_id = destination if isinstance(destination, int) else extract_user_id(destination.strip())
+        if user_id is not None:
+            user_data = USER_TIMEZONE_MAPPING.get(user_id)
+            entry = tz_index.abbreviation(user_data[1]) if user_data else None
+            label = f"**{user_data[0]}**" if user_data else None
+        else:
+            entries = tz_index.find(destination)
+            entry = entries[0] if entries else None
+            label = None
+
+        if entry:
+            labels.append(label)
+            to_entries.append(entry)
+        else:
+            unresolved.append(str(destination))
+
+    naive_time, format_12hr = parse_time(time_str)
+    from_entry = from_entries[0]
+    header = f"**{format_time(naive_time, format_12hr=format_12hr)}** in {from_entry.city.title()} is:"
+
+    lines = []
+    for label, (entry, hour, minute, day_shift) in zip(labels, tz_index.convert_many(naive_time, from_entry, to_entries)):
+        to_time = format_time(dt_time(hour, minute), format_12hr=format_12hr)
+        day_note = " (next day)" if day_shift > 0 else " (previous day)" if day_shift < 0 else ""
+        where = f"for {label} in {entry.city.title()}" if label else f"in {entry.city.title()}, {entry.gmt_offset}"
+        lines.append(f"**{to_time}**{day_note} {where}")
+
+    return header, list(dict.fromkeys(lines)) + [f"`{d}` not found." for d in unresolved]
 
-            converted_times.append(f"**{from_time}** in {from_city.title()} is **{to_time}** in {to_city.title()}, {gmt_offset}")
 
-    return list(set(converted_times))  
+def extract_user_id(mention):
+    if mention.startswith("<@") and mention.endswith(">"):
+        try:
+            return int(mention[2:-1].replace("!", ""))
+        except ValueError:
+            return None
+    return None
 
 
 # Function to format a time object to 12-hour or 24-hour time
@@ -254,16 +321,99 @@ intents.members = True
 intents.presences = True  # Make sure this is enabled
 client = discord.Client(intents=intents)
 
-tree = app_commands.CommandTree(client)
+# stamps every interaction so slash command latency can be recorded once it completes or fails
+class InstrumentedTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction):
+        interaction.extras["started"] = time.perf_counter()
+        return True
+
+    async def on_error(self, interaction, error):
+        record_command_latency(interaction, "error")
+        await super().on_error(interaction, error)
+
+
+def record_command_latency(interaction, status):
+    started = interaction.extras.get("started")
+    if started is not None and interaction.command is not None:
+        metrics.command_latency.observe(
+            time.perf_counter() - started, command=interaction.command.qualified_name, status=status
+        )
+
+
+tree = InstrumentedTree(client)
+
+# message counters live in memory, bot_stats.json is only a periodic snapshot
+stats = StatsSnapshotter("bot_stats.json", interval=STATS_INTERVAL, guild_count=lambda: len(client.guilds))
 test_guild = discord.Object(id=TEST_GUILD_ID)
 
-descriptions = load_descriptions()
+# COMMAND_SYNC=dev syncs only to the test guild (instant), the default syncs globally
+command_syncer = CommandSyncer(tree, "command_sync.json", mode=COMMAND_SYNC, dev_guild=test_guild)
+
+# shared rate matrix, every /convert pair is derived from one base currency
+fx_matrix = RateMatrix(SUPPORTED_CURRENCIES, base=FX_BASE_CURRENCY, ttl=FX_CACHE_TTL)
 
 
 # Channels for bot upkeep / error logs
 ERROR_CHANNEL_ID = 1357709109071184093  # error logs
 STARTUP_CHANNEL_ID = 1357709085184884766  # channel ID for startup messages
 PERIODIC_CHANNEL_ID = 1358254137946542283  # spams 28m so heroku doesn't bonk us
+AUDIT_CHANNEL_ID = 1359477496382226603  # slash command + DM forwarding
+
+# "-a" owner commands from on_message, one dict lookup per message with per-command timings
+admin = CommandRouter("-a", 223689629990125569)
+DOWNLOAD_DIR = Path("downloaded_chats")  # -a dl exports and their checkpoints
+
+# full-text index over chat_logs.txt (+ rotated segments) and downloaded_chats, caught up on each -a search
+search_index = ChatSearchIndex("chat_index.db", chat_log_path=chat_log.path, archive_dir=chat_log.archive_dir,
+                               download_dir=DOWNLOAD_DIR)
+
+# /metrics: everything below is read at scrape time, nothing extra runs per command
+loop_lag_monitor = metrics.LoopLagMonitor()
+metrics_server = metrics.MetricsServer(host=METRICS_HOST, port=METRICS_PORT)
+metrics.REGISTRY.gauge(
+    "worldwise_gateway_latency_seconds", "Discord gateway heartbeat latency",
+    fn=lambda: client.latency if math.isfinite(client.latency) else None,  # nan until the first heartbeat
+)
+metrics.REGISTRY.gauge("worldwise_guilds", "Guilds the bot is in", fn=lambda: len(client.guilds))
+metrics.REGISTRY.counter(
+    "worldwise_cache_hits_total", "Cache hits per cache", ("cache",),
+    fn=lambda: {
+        ("fx_matrix",): fx_matrix.hits,
+        ("geocode",): weather_client.geocode_hits,
+        ("weather",): weather_client.weather_hits,
+        ("translate",): translator.hits,
+    },
+)
+metrics.REGISTRY.counter(
+    "worldwise_cache_misses_total", "Cache misses per cache", ("cache",),
+    fn=lambda: {
+        ("fx_matrix",): fx_matrix.misses,
+        ("geocode",): weather_client.geocode_misses,
+        ("weather",): weather_client.weather_misses,
+        ("translate",): translator.misses,
+    },
+)
+metrics.REGISTRY.gauge(
+    "worldwise_cache_entries", "Entries held per cache", ("cache",),
+    fn=lambda: {
+        ("fx_matrix",): fx_matrix.stats()["currencies"],
+        ("geocode",): len(weather_client.geocodes),
+        ("translate",): translator.stats()["cached"],
+    },
+)
+metrics.REGISTRY.gauge(
+    "worldwise_fx_matrix_age_seconds", "Seconds since the FX rate matrix was refreshed", fn=fx_matrix.age
+)
+
+# slash command invocations are batched into one embed per window
+audit_log = AuditForwarder(lambda: client.get_channel(AUDIT_CHANNEL_ID))
+metrics.REGISTRY.counter(
+    "worldwise_audit_lines_total", "Slash command audit lines by what happened to them", ("outcome",),
+    fn=lambda: {(outcome,): audit_log.stats()[outcome] for outcome in ("recorded", "sent", "dropped", "failed")},
+)
+metrics.REGISTRY.gauge("worldwise_audit_queued", "Audit lines waiting to be posted", fn=lambda: audit_log.stats()["queued"])
+
+announced_startup = False
 
 # startup events
 @client.event
@@ -273,31 +423,33 @@ async def on_ready():
     # Change the bot's presence
     await client.change_presence(activity=discord.Game(name='time and money.'))
 
-    # Send startup message to the designated channel
-    startup_channel = client.get_channel(STARTUP_CHANNEL_ID)
-    if startup_channel:
-        await startup_channel.send("I am now online.")
-
+    # on_ready fires again after every gateway reconnect, only announce the first one
+    global announced_startup
+    if not announced_startup:
+        announced_startup = True
+        # Send startup message to the designated channel
+        startup_channel = client.get_channel(STARTUP_CHANNEL_ID)
+        if startup_channel:
+            await startup_channel.send("I am now online.")
 
-    #     await tree.sync(guild=test_guild) # Sync to guild — kept for testing
-    # print("Synced slash commands to test guild.")
+    # a fresh session rebuilt the member cache, indexes built from the old one may be stale
+    member_index.clear()
 
+    # uploads slash commands in the background, and only if they changed since the last sync
+    command_syncer.start()
 
-        await tree.sync()  # Sync globally
-    print("Synced slash commands globally.")
-
-    
     # Start background task for periodic messages so Heroku doesn't kill
     #client.loop.create_task(send_periodic_message())
 
+@client.event
+async def on_app_command_completion(interaction, command):
+    record_command_latency(interaction, "ok")
+
+
 # command forwarding
 @client.event
 async def on_interaction(interaction: discord.Interaction):
     if interaction.type == discord.InteractionType.application_command:
-        log_channel = client.get_channel(1359477496382226603)
-        if not log_channel:
-            return  # Fail silently if the log channel doesn't exist
-
         user = interaction.user
         display_name = user.display_name
         command_name = interaction.command.name if interaction.command else "Unknown"
@@ -312,17 +464,11 @@ async def on_interaction(interaction: discord.Interaction):
                 options.append(f"{name}={value}")
         options_str = ", ".join(options) if options else "No options"
 
-        log_msg = (
-            f"**Slash command used** in **{guild_name}**:\n"
-            f"`/{command_name}` by {display_name} (ID: {user.id})\n"
-            f"Options: {options_str}"
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        audit_log.record(
+            f"`{timestamp}` `/{command_name}` by {display_name} (ID: {user.id}) in **{guild_name}** — {options_str}"
         )
 
-        try:
-            await log_channel.send(log_msg)
-        except discord.HTTPException:
-            pass  # Silently ignore logging failures
-
 
 @client.event
 async def on_message(message):
@@ -330,27 +476,15 @@ async def on_message(message):
         return
     
 
-    if message.guild:
-        global command_counter
-    command_counter += 1
-    active_users.add(str(message.author))
+    stats.record_message(message.author)  # snapshotted to bot_stats.json in the background
+    metrics.messages_seen.inc()
     log_command_to_file(message.author.display_name, message.content, message.guild, message.channel)
 
-
-    # Write stats
-    with open("bot_stats.json", "w") as f:
-        json.dump({
-            "guilds": len(client.guilds),
-            "commands_today": command_counter,
-            "active_users": len(active_users),
-            "updated": datetime.now().isoformat()
-        }, f)
-
     
 
 # DM forwarding logic 
     if isinstance(message.channel, discord.DMChannel):
-        target_channel = client.get_channel(1359477496382226603)
+        target_channel = client.get_channel(AUDIT_CHANNEL_ID)
         if target_channel:
             display_name = message.author.display_name
 
@@ -370,540 +504,604 @@ async def on_message(message):
 
     
     
-# Admin-only commands
-    
-    if message.content.lower().strip() == "-a uptime": 
-        if message.author.id != 223689629990125569: #admin check
-            await message.channel.send("You do not have permission to use this command.")
-            return
-
-        uptime_seconds = int(time.time() - start_time)
-        hours, remainder = divmod(uptime_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-
-        await message.channel.send(
-            f"I've been online for **{hours}h {minutes}m {seconds}s**."
-        )
+# Admin-only commands, routed by name — see the @admin.command handlers below
+    await admin.dispatch(message)
 
-    if message.content.lower().startswith("-a purge"):
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
 
-        parts = message.content.strip().split()
+# -a admin commands
 
-        if len(parts) != 3 or not parts[2].isdigit():
-            await message.channel.send("Invalid syntax. Use `-a purge [number]`.")
-            return
+@admin.command("uptime")
+async def uptime_command(message, args, rest):
+    uptime_seconds = int(time.time() - start_time)
+    hours, remainder = divmod(uptime_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
 
-        count = int(parts[2])
+    await message.channel.send(
+        f"I've been online for **{hours}h {minutes}m {seconds}s**."
+    )
 
-        if not message.channel.permissions_for(message.guild.me).manage_messages:
-            await message.channel.send("I don't have permission to delete messages in this channel.")
-            return
+@admin.command("fxstats")
+async def fxstats_command(message, args, rest):
+    fx = fx_matrix.stats()
+    age = f"{fx['age_seconds']}s" if fx["age_seconds"] is not None else "never refreshed"
+    await message.channel.send(
+        f"**FX rate matrix** (base {fx['base']}, TTL {fx['ttl']}s)\n"
+        f"Currencies cached: **{fx['currencies']}** | Age: **{age}**\n"
+        f"Hits: **{fx['hits']}** | Misses: **{fx['misses']}** | Hit ratio: **{fx['hit_ratio']:.1%}**\n"
+        f"Refreshes: **{fx['refreshes']}** | Failed refreshes: **{fx['refresh_failures']}**"
+    )
 
-        # Purge up to `count` messages before deletion command
-        deleted = await message.channel.purge(limit=count + 1, check=lambda m: m.id != message.id)
-        await message.channel.send(f"Deleted {len(deleted)} messages.")
 
-#left in to swap later
+@admin.command("timings")
+async def timings_command(message, args, rest):
+    rows = sorted(admin.stats().items(), key=lambda item: item[1]["avg_ms"], reverse=True)
+    lines = [
+        f"`-a {name}`: {row['calls']} calls, avg **{row['avg_ms']}ms**, max {row['max_ms']}ms, {row['errors']} errors"
+        for name, row in rows if row["calls"]
+    ]
+    await message.channel.send("\n".join(lines) if lines else "No admin commands have run yet.")
 
-    # Send and delete confirmation after a few seconds
-        # confirm_msg = await message.channel.send(f"Deleted {len(deleted)} messages.")
-        # await asyncio.sleep(5)
-        # await confirm_msg.delete()
+@admin.command("purge")
+async def purge_command(message, args, rest):
+    if len(args) != 1 or not args[0].isdigit():
+        await message.channel.send("Invalid syntax. Use `-a purge [number]`.")
+        return
 
+    count = int(args[0])
 
+    if not message.channel.permissions_for(message.guild.me).manage_messages:
+        await message.channel.send("I don't have permission to delete messages in this channel.")
+        return
 
-# module command
-    if message.content.lower().strip() == "-a modules":
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
+    # Purge up to `count` messages before deletion command
+    deleted = await message.channel.purge(limit=count + 1, check=lambda m: m.id != message.id)
+    await message.channel.send(f"Deleted {len(deleted)} messages.")
 
-        import sys
+#left in to swap later
 
-        # Gather modules and sizes
-        module_sizes = []
-        for name, mod in sys.modules.items():
-            try:
-                size = sys.getsizeof(mod)
-                module_sizes.append((name, size))
-            except Exception:
-                continue
+    # Send and delete confirmation after a few seconds
+    # confirm_msg = await message.channel.send(f"Deleted {len(deleted)} messages.")
+    # await asyncio.sleep(5)
+    # await confirm_msg.delete()
 
-        module_sizes.sort(key=lambda x: x[0].lower())  # sort alphabetically
-        total_modules = len(module_sizes)
-
-        # Break into pages (20 per page)
-        modules_per_page = 20
-        pages = [
-            module_sizes[i:i + modules_per_page]
-            for i in range(0, total_modules, modules_per_page)
-        ]
-
-        class ModulePageView(discord.ui.View):
-            def __init__(self):
-                super().__init__()
-                self.page = 0
-
-            async def update_message(self, interaction):
-                embed = discord.Embed(
-                    title="📦 Loaded Python Modules",
-                    description=f"Total modules: **{total_modules}** | Page **{self.page + 1} / {len(pages)}**",
-                    color=discord.Color.teal()
-                )
-                page_content = "\n".join(
-                    f"{name}: {size:,} bytes" for name, size in pages[self.page]
-                )
-                embed.add_field(name="Module Name & Size", value=page_content, inline=False)
-                await interaction.response.edit_message(embed=embed, view=self)
-
-            @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
-            async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
-                if self.page > 0:
-                    self.page -= 1
-                    await self.update_message(interaction)
-
-            @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
-            async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
-                if self.page < len(pages) - 1:
-                    self.page += 1
-                    await self.update_message(interaction)
-
-        # Initial embed
-        view = ModulePageView()
-        first_embed = discord.Embed(
-            title="Loaded Python Modules",
-            description=f"Total modules: **{total_modules}** | Page **1 / {len(pages)}**",
-            color=discord.Color.teal()
-        )
-        page_content = "\n".join(
-            f"{name}: {size:,} bytes" for name, size in pages[0]
-        )
-        first_embed.add_field(name="Module Name & Size", value=page_content, inline=False)
 
-        await message.channel.send(embed=first_embed, view=view)
 
+# module command
+@admin.command("modules")
+async def modules_command(message, args, rest):
+    # Gather modules and sizes
+    module_sizes = []
+    for name, mod in sys.modules.items():
+        try:
+            size = sys.getsizeof(mod)
+            module_sizes.append((name, size))
+        except Exception:
+            continue
+
+    module_sizes.sort(key=lambda x: x[0].lower())  # sort alphabetically
+    total_modules = len(module_sizes)
+
+    # Break into pages (20 per page)
+    modules_per_page = 20
+    pages = [
+        module_sizes[i:i + modules_per_page]
+        for i in range(0, total_modules, modules_per_page)
+    ]
+
+    class ModulePageView(discord.ui.View):
+        def __init__(self):
+            super().__init__()
+            self.page = 0
+
+        async def update_message(self, interaction):
+            embed = discord.Embed(
+                title="📦 Loaded Python Modules",
+                description=f"Total modules: **{total_modules}** | Page **{self.page + 1} / {len(pages)}**",
+                color=discord.Color.teal()
+            )
+            page_content = "\n".join(
+                f"{name}: {size:,} bytes" for name, size in pages[self.page]
+            )
+            embed.add_field(name="Module Name & Size", value=page_content, inline=False)
+            await interaction.response.edit_message(embed=embed, view=self)
 
-# prune command
-    if message.content.lower().startswith("-a prune"):
-        if message.author.id != 223689629990125569:  # Check if the user is the admin
-            await message.channel.send("You do not have permission to use this command.")
-            return
+        @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+        async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+            if self.page > 0:
+                self.page -= 1
+                await self.update_message(interaction)
+
+        @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+        async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+            if self.page < len(pages) - 1:
+                self.page += 1
+                await self.update_message(interaction)
+
+    # Initial embed
+    view = ModulePageView()
+    first_embed = discord.Embed(
+        title="Loaded Python Modules",
+        description=f"Total modules: **{total_modules}** | Page **1 / {len(pages)}**",
+        color=discord.Color.teal()
+    )
+    page_content = "\n".join(
+        f"{name}: {size:,} bytes" for name, size in pages[0]
+    )
+    first_embed.add_field(name="Module Name & Size", value=page_content, inline=False)
 
-        parts = message.content.strip().split(maxsplit=3)
-        if len(parts) < 4:
-            await message.channel.send("Usage: `-a prune #channel|channel_id <keyword>`.")
-            return
+    await message.channel.send(embed=first_embed, view=view)
 
-        channel_arg = parts[2]
-        keyword = parts[3].lower()
 
-        # Resolve channel
-        target_channel = None
-        if message.channel_mentions:
-            target_channel = message.channel_mentions[0]
-        elif channel_arg.isdigit():
-            target_channel = client.get_channel(int(channel_arg))
+# prune command, "-a prune #channel [dry] <keyword>" — "dry" only counts the matches
+@admin.command("prune")
+async def prune_command(message, args, rest):
+    usage = "Usage: `-a prune #channel|channel_id [dry] <keyword>`."
+    if len(args) < 2:
+        await message.channel.send(usage)
+        return
 
-        if not target_channel:
-            await message.channel.send("Could not find the specified channel.")
+    channel_arg = args[0]
+    keyword_text = rest.split(maxsplit=1)[1]
+    dry_run = args[1].lower() in ("dry", "--dry-run")
+    if dry_run:
+        if len(args) < 3:
+            await message.channel.send(usage)
             return
+        keyword_text = keyword_text.split(maxsplit=1)[1]
+    keyword = keyword_text.lower()
+
+    # Resolve channel
+    target_channel = None
+    if message.channel_mentions:
+        target_channel = message.channel_mentions[0]
+    elif channel_arg.isdigit():
+        target_channel = client.get_channel(int(channel_arg))
+
+    if not target_channel:
+        await message.channel.send("Could not find the specified channel.")
+        return
 
+    # Send initial status message
+    action = "Counting" if dry_run else "Deleting"
+    status_msg = await message.channel.send(f"{action} messages containing '{keyword}' in {target_channel.mention}...")
 
-        # Send initial status message
-        status_msg = await message.channel.send(f"Deleting messages containing '{keyword}' in {target_channel.mention}...")
+    job = PruneJob(target_channel, lambda msg: keyword in msg.content.lower(), dry_run=dry_run)
+    last_update = time.time()  # Initialize timer for status updates
 
-        # Fetch and delete messages containing the keyword
-        total_deleted = 0
-        last_update = time.time()  # Initialize timer for status updates
+    async def progress(job):
+        nonlocal last_update
+        # Provide status updates every 5 seconds
+        if time.time() - last_update >= 5:
+            if job.dry_run:
+                done = f"Found **{job.matched:,}** matches so far"
+            else:
+                done = f"Deleted **{job.deleted:,}** of **{job.matched:,}** matches so far"
+            scan_rate = job.scanned / job.elapsed() if job.elapsed() else 0.0
+            await status_msg.edit(
+                content=f"{done}, scanned **{job.scanned:,}** messages ({scan_rate:.0f} scanned/s)... ⏳"
+            )
+            last_update = time.time()  # Reset the timer
 
-        try:
-            async for msg in target_channel.history(limit=None):
-                if keyword in msg.content.lower():
-                    await msg.delete()
-                    total_deleted += 1
-
-                    # Provide status updates every 5 seconds
-                    if time.time() - last_update >= 5:
-                        await status_msg.edit(content=f"Deleted **{total_deleted}** messages so far... ⏳")
-                        last_update = time.time()  # Reset the timer
-
-        except discord.Forbidden:
-            await status_msg.edit(content="I don't have permission to delete messages in that channel.")
-            return
-        except Exception as e:
-            await status_msg.edit(content=f"Error during deletion: {e}")
-            return
+    try:
+        await job.run(progress=progress)
+    except discord.Forbidden:
+        await status_msg.edit(content="I don't have permission to delete messages in that channel.")
+        return
+    except Exception as e:
+        await status_msg.edit(content=f"Error during deletion: {e} {job.summary()}")
+        return
 
-        await status_msg.edit(content=f"✅ Deletion complete. Total messages deleted: **{total_deleted}**.")
+    done = "Dry run complete." if dry_run else "Deletion complete."
+    await status_msg.edit(content=f"✅ {done} {job.summary()}")
 
-    if message.content.lower().startswith("-a dl"):
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
 
-        parts = message.content.strip().split(maxsplit=2)
-        if len(parts) < 3:
-            await message.channel.send("Usage: `-a dl #channel` or `-a dl channel_id`.")
-            return
+# "-a dl #channel [jsonl] [gz] [fresh]" streams the history to disk in upload-sized parts,
+# an interrupted export picks up from its checkpoint unless "fresh" is given.
+# "-a dl guild [guild_id] ..." archives every readable channel and thread in the server
+@admin.command("dl")
+async def dl_command(message, args, rest):
+    if not args:
+        await message.channel.send("Usage: `-a dl #channel|channel_id [jsonl] [gz] [fresh]` or `-a dl guild [guild_id] [jsonl] [gz] [fresh]`.")
+        return
 
-        # Resolve channel
-        channel_arg = parts[2]
-        target_channel = None
+    if args[0].lower() == "guild":
+        await archive_guild(message, args[1:])
+        return
 
-        if message.channel_mentions:
-            target_channel = message.channel_mentions[0]
-        elif channel_arg.isdigit():
-            target_channel = client.get_channel(int(channel_arg))
+    # Resolve channel
+    channel_arg = args[0]
+    target_channel = None
 
-        if not target_channel:
-            await message.channel.send("Could not find the specified channel.")
-            return
+    if message.channel_mentions:
+        target_channel = message.channel_mentions[0]
+    elif channel_arg.isdigit():
+        target_channel = client.get_channel(int(channel_arg))
 
-        # Send initial status message
-        status_msg = await message.channel.send(f"Fetching message history from {target_channel.mention}...")
+    if not target_channel:
+        await message.channel.send("Could not find the specified channel.")
+        return
 
-        messages = []
-        total_count = 0
-        update_interval = 1  # seconds
-        last_update = time.time()
+    options = {option.lower() for option in args[1:]}
+    exporter = ChannelExporter(
+        target_channel,
+        output_dir=DOWNLOAD_DIR,
+        fmt="jsonl" if "jsonl" in options else "txt",
+        compress="gz" in options or "gzip" in options,
+        chunk_bytes=upload_chunk_bytes(message.channel),
+    )
 
-        try:
-            async for msg in target_channel.history(limit=None, oldest_first=True):
-                try:
-                    timestamp = msg.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                    author_name = (
-                        msg.author.display_name
-                        if hasattr(msg.author, "display_name")
-                        else msg.author.name
-                    )
-                    content = msg.content.replace('\n', ' ')
-                    messages.append(f"[{timestamp}] {author_name}: {content}")
-                    total_count += 1
-
-                    # Edit status every 2 seconds
-                    if time.time() - last_update >= update_interval:
-                        await status_msg.edit(content=f"Messages collected: **{total_count:,}**... ⏳")
-                        last_update = time.time()
-
-                except Exception as e:
-                    print(f"Error processing message: {e}")
-                    continue
-
-        except discord.Forbidden:
-            await status_msg.edit(content="I don't have permission to read message history in that channel.")
-            return
-        except Exception as e:
-            await status_msg.edit(content=f"Error fetching messages: {e}")
-            return
+    # Send initial status message
+    status_msg = await message.channel.send(f"Fetching message history from {target_channel.mention}...")
 
-        if not messages:
-            await status_msg.edit(content="No messages found in that channel.")
-            return
+    update_interval = 2  # seconds
+    last_update = time.time()
 
-        # Save to file
-        from pathlib import Path
-        output_dir = Path("downloaded_chats")
-        output_dir.mkdir(parents=True, exist_ok=True)
+    async def progress(total_count):
+        nonlocal last_update
+        # Edit status every 2 seconds
+        if time.time() - last_update >= update_interval:
+            await status_msg.edit(content=f"Messages saved: **{total_count:,}**... ⏳")
+            last_update = time.time()
 
-        filename = f"{target_channel.name}_history.txt"
-        filepath = output_dir / filename
+    try:
+        state = await exporter.run(progress=progress, fresh="fresh" in options)
+    except discord.Forbidden:
+        await status_msg.edit(content="I don't have permission to read message history in that channel.")
+        return
+    except Exception as e:
+        resume_note = " Run the same command again to resume." if exporter.state and exporter.state["messages"] else ""
+        await status_msg.edit(content=f"Error fetching messages: {e}{resume_note}")
+        return
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write("\n".join(messages))
+    if not state["messages"]:
+        await status_msg.edit(content="No messages found in that channel.")
+        return
 
-        await status_msg.edit(
-            content=f"✅ Download complete. **{total_count:,}** messages fetched from {target_channel.mention}."
-        )
-        await message.channel.send(file=discord.File(str(filepath)))
+    resumed = " (resumed from checkpoint)" if exporter.resumed else ""
+    await status_msg.edit(
+        content=f"✅ Download complete{resumed}. **{state['messages']:,}** messages fetched from {target_channel.mention} "
+                f"in **{len(state['parts'])}** file(s)."
+    )
+    for path in exporter.part_paths():
+        await message.channel.send(file=discord.File(str(path)))
 
 
+async def archive_guild(message, args):
+    guild = message.guild
+    if args and args[0].isdigit():
+        guild = client.get_guild(int(args[0]))
+        args = args[1:]
+    if not guild:
+        await message.channel.send("Could not find the specified server.")
+        return
 
-    if message.content.lower() == "-a refresh": #solely for testing purposes
-        if message.author.guild_permissions.administrator:
-            try:
-                await tree.sync(guild=message.guild)
-                await message.channel.send("Slash commands have been refreshed for this server.")
-            except Exception as e:
-                await message.channel.send(f"Failed to refresh slash commands: {e}")
-        else:
-            await message.channel.send("You need to be an admin to use this command.")
+    options = {option.lower() for option in args}
+    archiver = GuildArchiver(
+        guild,
+        output_dir=DOWNLOAD_DIR,
+        fmt="jsonl" if "jsonl" in options else "txt",
+        compress="gz" in options or "gzip" in options,
+        chunk_bytes=upload_chunk_bytes(message.channel),
+    )
 
-    if message.content.lower() in ["-a guilds"]:
-        if message.author.id != 223689629990125569: 
-            await message.channel.send("You do not have permission to use this command.")
-            return
+    status_msg = await message.channel.send(f"Archiving every readable channel in **{guild.name}**...")
+    last_update = time.time()
 
-        guilds = client.guilds
-        if guilds:
-            guild_list = "\n".join(
-                [f"- **{guild.name}** (ID: {guild.id}, Members: **{guild.member_count}**)" for guild in guilds]
+    async def progress(archiver):
+        nonlocal last_update
+        if time.time() - last_update >= 5:
+            await status_msg.edit(
+                content=f"Channels done: **{archiver.finished()} / {len(archiver.channels)}** | "
+                        f"Messages saved: **{archiver.total:,}** ({archiver.rate():.0f} msg/s)... ⏳"
             )
-            await message.channel.send(f"**The bot is in the following servers:**\n{guild_list}")
-        else:
-            await message.channel.send("**The bot is not in any servers.**")
-        return
-    
-    if message.content.lower().startswith("-a fquit"):
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
-
-        parts = message.content.strip().split()
+            last_update = time.time()
 
-    # Expects exactly 3 parts: ["-a", "fquit", "<guild_id>"]
-        if len(parts) != 3:
-            return  
+    try:
+        manifest_path = await archiver.run(progress=progress, fresh="fresh" in options)
+    except Exception as e:
+        await status_msg.edit(content=f"Error archiving server: {e}")
+        return
 
-        if not parts[2].isdigit():
-            await message.channel.send("Invalid syntax. Use `-a fquit [guild_id]`.")
-            return
+    failed = [entry["name"] for entry in archiver.results.values() if not entry["complete"]]
+    failed_note = f"\nFailed (run again to resume): {', '.join(failed)}" if failed else ""
+    await status_msg.edit(
+        content=f"✅ Archive complete. **{archiver.total:,}** messages from **{len(archiver.channels)}** channels "
+                f"in {archiver.elapsed():.0f}s ({archiver.rate():.0f} msg/s), saved to `{archiver.output_dir}`.{failed_note}"
+    )
+    await message.channel.send(file=discord.File(str(manifest_path)))
 
-        guild_id = int(parts[2])
-        guild = discord.utils.get(client.guilds, id=guild_id)
 
-        if guild:
-            await guild.leave()
-            await message.channel.send(f"✅ Left server: **{guild.name}** (ID: {guild.id})")
+# "-a search [from:name] [in:channel] [after:YYYY-MM-DD] [before:YYYY-MM-DD] words..."
+@admin.command("search")
+async def search_command(message, args, rest):
+    try:
+        tokens = shlex.split(rest)  # lets names with spaces be quoted, from:"some name"
+    except ValueError:
+        tokens = rest.split()
+
+    filters = {}
+    keywords = []
+    for token in tokens:
+        key, sep, value = token.partition(":")
+        if sep and key.lower() in ("from", "in", "after", "before") and value:
+            filters[key.lower()] = value.lstrip("#")
         else:
-            await message.channel.send("Guild not found or the bot is not in that server.")
-
-    if message.content.lower().strip() == "-a desc list":
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
+            keywords.append(token)
 
-        data = load_descriptions()
+    status_msg = await message.channel.send("Searching... ⏳")
+    try:
+        added = await search_index.update()
+    except Exception as e:
+        await status_msg.edit(content=f"Updating the search index failed: {e}")
+        return
 
-        if not data:
-            await message.channel.send("No descriptions have been set yet.")
-            return
+    if not keywords and not filters:
+        info = await asyncio.to_thread(search_index.stats)
+        await status_msg.edit(
+            content=f"Indexed **{info['messages']:,}** lines from **{info['sources']}** files (+{added:,} just now).\n"
+                    "Usage: `-a search [from:name] [in:channel] [after:YYYY-MM-DD] [before:YYYY-MM-DD] words...`"
+        )
+        return
 
-        embed = discord.Embed(
-            title="Public Descriptions",
-            description="Here are all saved user descriptions.",
-            color=discord.Color.dark_teal()
+    try:
+        rows, seconds = await search_index.search(
+            keywords, author=filters.get("from"), channel=filters.get("in"),
+            after=filters.get("after"), before=filters.get("before"), limit=20,
         )
+    except sqlite3.OperationalError as e:
+        await status_msg.edit(content=f"Search failed: {e}")
+        return
 
-        for uid, desc in data.items():
-            try:
-                user = await message.guild.fetch_member(int(uid))
-                embed.add_field(name=user.display_name, value=desc, inline=False)
-            except:
-                embed.add_field(name=f"Unknown User ({uid})", value=desc, inline=False)
+    if not rows:
+        await status_msg.edit(content=f"No matches ({seconds * 1000:.1f}ms).")
+        return
 
-        await message.channel.send(embed=embed)
+    lines = []
+    length = 0
+    for ts, guild, channel, author, content, path, offset in rows:
+        line = f"[{ts}] #{channel} {author}: {content}"[:300]
+        if length + len(line) > 1800:
+            break
+        lines.append(line)
+        length += len(line) + 1
+    body = "\n".join(lines).replace("```", "`\u200b``")  # don't let a message close the code block
+    await status_msg.edit(content=f"**{len(rows)}** newest matches in {seconds * 1000:.1f}ms:\n```\n{body}\n```")
+
+
+@admin.command("refresh", permission=None)  # server admins, not just the owner
+async def refresh_command(message, args, rest):
+    if message.author.guild_permissions.administrator:
+        try:
+            await tree.sync(guild=message.guild)
+            await message.channel.send("Slash commands have been refreshed for this server.")
+        except Exception as e:
+            await message.channel.send(f"Failed to refresh slash commands: {e}")
+    else:
+        await message.channel.send("You need to be an admin to use this command.")
+
+@admin.command("guilds")
+async def guilds_command(message, args, rest):
+    guilds = client.guilds
+    if guilds:
+        guild_list = "\n".join(
+            [f"- **{guild.name}** (ID: {guild.id}, Members: **{guild.member_count}**)" for guild in guilds]
+        )
+        await message.channel.send(f"**The bot is in the following servers:**\n{guild_list}")
+    else:
+        await message.channel.send("**The bot is not in any servers.**")
 
-    if message.content.lower().strip() == "-a desc clear":
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
+@admin.command("fquit")
+async def fquit_command(message, args, rest):
+    # Expects exactly one argument: <guild_id>
+    if len(args) != 1:
+        return
 
-        save_descriptions({})
-        await message.channel.send("✅ All descriptions have been cleared.")
+    if not args[0].isdigit():
+        await message.channel.send("Invalid syntax. Use `-a fquit [guild_id]`.")
+        return
 
-    if message.content.lower().startswith("-a desc"):
-        if message.author.id != 223689629990125569:
-            return  # Silently ignore non-admins
+    guild_id = int(args[0])
+    guild = discord.utils.get(client.guilds, id=guild_id)
 
-        parts = message.content.strip().split()
+    if guild:
+        await guild.leave()
+        await message.channel.send(f"✅ Left server: **{guild.name}** (ID: {guild.id})")
+    else:
+        await message.channel.send("Guild not found or the bot is not in that server.")
 
-        if len(parts) < 3:
-            return  # Silently ignore bad input
+@admin.command("desc list")
+async def desc_list_command(message, args, rest):
+    data = descriptions.all()
 
-        # Tries to resolve the user
-        target_user = None
-        user_token = parts[2]
+    if not data:
+        await message.channel.send("No descriptions have been set yet.")
+        return
 
-        if message.mentions:
-            target_user = message.mentions[0]
-        elif user_token.isdigit():
-            try:
-                target_user = await message.guild.fetch_member(int(user_token))
-            except:
-                return
-        else:
-            return
+    embed = discord.Embed(
+        title="Public Descriptions",
+        description="Here are all saved user descriptions.",
+        color=discord.Color.dark_teal()
+    )
 
-        uid = str(target_user.id)
-        data = load_descriptions()
+    for uid, desc in data.items():
+        try:
+            user = await message.guild.fetch_member(int(uid))
+            embed.add_field(name=user.display_name, value=desc, inline=False)
+        except:
+            embed.add_field(name=f"Unknown User ({uid})", value=desc, inline=False)
 
-        parts = message.content.strip().split(maxsplit=3)
-        if len(parts) < 4:
-            return
+    await message.channel.send(embed=embed)
 
-        new_desc = parts[3].strip()
-        if not new_desc:
-            return
+@admin.command("desc clear")
+async def desc_clear_command(message, args, rest):
+    descriptions.clear()
+    await message.channel.send("✅ All descriptions have been cleared.")
 
-        data[uid] = new_desc
-        save_descriptions(data)
-        await message.channel.send(f"✅ Updated description for **{target_user.display_name}**.")
+@admin.command("desc", permission="owner_silent")  # Silently ignore non-admins
+async def desc_command(message, args, rest):
+    if not args:
+        return  # Silently ignore bad input
 
+    # Tries to resolve the user
+    target_user = None
+    user_token = args[0]
 
-    if message.content.lower().strip() == "-a shutdown":
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
+    if message.mentions:
+        target_user = message.mentions[0]
+    elif user_token.isdigit():
+        try:
+            target_user = await message.guild.fetch_member(int(user_token))
+        except:
             return
+    else:
+        return
 
-        await message.channel.send("Shutting down.")
-        await client.close()
-
-    if message.content.lower().startswith("-a broadcast"):
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
+    uid = str(target_user.id)
 
-        parts = message.content.strip().split()
+    parts = rest.split(maxsplit=1)
+    if len(parts) < 2:
+        return
 
-        if len(parts) < 3:
-            return  
+    new_desc = parts[1].strip()
+    if not new_desc:
+        return
 
-        target_channel = None
-        channel_arg = parts[2]
+    descriptions.set(uid, new_desc)
+    await message.channel.send(f"✅ Updated description for **{target_user.display_name}**.")
 
-        # Try #mention-channel first
-        if message.channel_mentions:
-            target_channel = message.channel_mentions[0]
-        # Else try raw ID
-        elif channel_arg.isdigit():
-            target_channel = client.get_channel(int(channel_arg))
 
-        if not target_channel:
-            return  # silently ignore if no valid channel
+@admin.command("shutdown")
+async def shutdown_command(message, args, rest):
+    await message.channel.send("Shutting down.")
+    await client.close()
 
-        # Figure out where the message starts
-        try:
-            mention_text = f"<#{target_channel.id}>" if message.channel_mentions else channel_arg
-            msg_start = message.content.index(mention_text) + len(mention_text)
-            announcement = message.content[msg_start:].strip()
-        except:
-            return
+@admin.command("broadcast")
+async def broadcast_command(message, args, rest):
+    if not args:
+        return
 
-        if not announcement:
-            return  # silently ignore if no message to send
+    target_channel = None
+    channel_arg = args[0]
 
-        try:
-            await target_channel.send(announcement)
-            await message.channel.send(f"✅ Announcement sent to {target_channel.mention}.")
-        except discord.Forbidden:
-            await message.channel.send(f"I don't have permission to send messages in {target_channel.mention}.")
-
-    # Example: -a dm <@user> or <userID> <message>
-    if message.content.lower().startswith("-a dm"):
-        # Optional: check if the author has permission
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
+    # Try #mention-channel first
+    if message.channel_mentions:
+        target_channel = message.channel_mentions[0]
+    # Else try raw ID
+    elif channel_arg.isdigit():
+        target_channel = client.get_channel(int(channel_arg))
 
-        parts = message.content.strip().split()
-        if len(parts) < 4:
-            await message.channel.send("Usage: `-a dm <@user or userID> <message>`")
-            return
+    if not target_channel:
+        return  # silently ignore if no valid channel
 
-        # Extract the target user
-        target_user = None
-        if message.mentions:
-            target_user = message.mentions[0]
-        else:
-            user_arg = parts[2]
-            if user_arg.isdigit():
-                try:
-                    target_user = await client.fetch_user(int(user_arg))
-                except discord.NotFound:
-                    await message.channel.send("User not found.")
-                    return
-                except discord.HTTPException:
-                    await message.channel.send("Failed to fetch user.")
-                    return
-
-        if not target_user:
-            await message.channel.send("Could not resolve the user.")
-            return
+    # Everything after the channel is the announcement
+    parts = rest.split(maxsplit=1)
+    announcement = parts[1].strip() if len(parts) == 2 else ""
 
-        # Extract the actual message
-        try:
-            mention_text = f"<@{target_user.id}>" if message.mentions else parts[2]
-            msg_start = message.content.index(mention_text) + len(mention_text)
-            dm_message = message.content[msg_start:].strip()
-        except Exception as e:
-            await message.channel.send("Failed to parse message.")
-            return
+    if not announcement:
+        return  # silently ignore if no message to send
 
-        if not dm_message:
-            await message.channel.send("No message content provided.")
-            return
+    try:
+        await target_channel.send(announcement)
+        await message.channel.send(f"✅ Announcement sent to {target_channel.mention}.")
+    except discord.Forbidden:
+        await message.channel.send(f"I don't have permission to send messages in {target_channel.mention}.")
+
+# Example: -a dm <@user> or <userID> <message>
+@admin.command("dm")
+async def dm_command(message, args, rest):
+    if len(args) < 2:
+        await message.channel.send("Usage: `-a dm <@user or userID> <message>`")
+        return
 
-        # Send the DM
-        try:
-            await target_user.send(dm_message)
-            await message.channel.send(f"✅ DM sent to {target_user.name}.")
-        except discord.Forbidden:
-            await message.channel.send("I can't send a DM to that user.")
-        except discord.HTTPException:
-            await message.channel.send("Failed to send the DM.")
+    # Extract the target user
+    target_user = None
+    if message.mentions:
+        target_user = message.mentions[0]
+    else:
+        user_arg = args[0]
+        if user_arg.isdigit():
+            try:
+                target_user = await client.fetch_user(int(user_arg))
+            except discord.NotFound:
+                await message.channel.send("User not found.")
+                return
+            except discord.HTTPException:
+                await message.channel.send("Failed to fetch user.")
+                return
 
+    if not target_user:
+        await message.channel.send("Could not resolve the user.")
+        return
 
-    if message.content.lower().strip() == "-a role list":
-        if message.author.id != 223689629990125569:
-            await message.channel.send("You do not have permission to use this command.")
-            return
+    # Everything after the user is the message
+    dm_message = rest.split(maxsplit=1)[1].strip()
 
-        roles = message.guild.roles[1:]  # Exclude @everyone
-        if not roles:
-            await message.channel.send("No roles found in this server.")
-            return
+    if not dm_message:
+        await message.channel.send("No message content provided.")
+        return
 
-        embed = discord.Embed(
-            title="📜 Role List",
-            description="Each role and its assigned members",
-            color=discord.Color.dark_gold()
-        )
+    # Send the DM
+    try:
+        await target_user.send(dm_message)
+        await message.channel.send(f"✅ DM sent to {target_user.name}.")
+    except discord.Forbidden:
+        await message.channel.send("I can't send a DM to that user.")
+    except discord.HTTPException:
+        await message.channel.send("Failed to send the DM.")
+
+
+@admin.command("role list")
+async def role_list_command(message, args, rest):
+    roles = message.guild.roles[1:]  # Exclude @everyone
+    if not roles:
+        await message.channel.send("No roles found in this server.")
+        return
 
-        for role in sorted(roles, key=lambda r: r.position, reverse=True):
-            members = [member.display_name for member in role.members]
-            if members:
-                member_list = ", ".join(members[:10])
-                extra = f" and {len(members) - 10} more..." if len(members) > 10 else ""
-                embed.add_field(name=f"{role.name} ({len(members)})", value=member_list + extra, inline=False)
+    embed = discord.Embed(
+        title="📜 Role List",
+        description="Each role and its assigned members",
+        color=discord.Color.dark_gold()
+    )
 
-        await message.channel.send(embed=embed)
+    for role in sorted(roles, key=lambda r: r.position, reverse=True):
+        members = [member.display_name for member in role.members]
+        if members:
+            member_list = ", ".join(members[:10])
+            extra = f" and {len(members) - 10} more..." if len(members) > 10 else ""
+            embed.add_field(name=f"{role.name} ({len(members)})", value=member_list + extra, inline=False)
 
-    if message.content.lower() == "-a help":
-        if message.author.id != 223689629990125569:  # Check if the user is the admin
-            await message.channel.send("You do not have permission to use this command.")
-            return
+    await message.channel.send(embed=embed)
 
-        # Read the help text from the file
-        with open("admin_command_help.txt", "r", encoding="utf-8") as file:
-            help_lines = file.read().split('\n\n')  # Split by double newline to separate each command block
+@admin.command("help")
+async def admin_help_command(message, args, rest):
+    # Read the help text from the file
+    with open("admin_command_help.txt", "r", encoding="utf-8") as file:
+        help_lines = file.read().split('\n\n')  # Split by double newline to separate each command block
 
-        # Create an embed object for the help message
-        embed = discord.Embed(title="Admin Commands Help", description="All commands use the `-a` prefix.", color=discord.Color.red())
+    # Create an embed object for the help message
+    embed = discord.Embed(title="Admin Commands Help", description="All commands use the `-a` prefix.", color=discord.Color.red())
 
-        # Parse each block and add to the embed
-        for block in help_lines:
-            if block.strip():  # Ensure that the block is not empty
-                lines = block.split('\n', 1)  # Split into command and description
-                if len(lines) == 2:
-                    command, description = lines
-                    # Format command with bold and add field to embed
-                    embed.add_field(name=f"**{command.strip()}**", value=description.strip(), inline=False)
+    # Parse each block and add to the embed
+    for block in help_lines:
+        if block.strip():  # Ensure that the block is not empty
+            lines = block.split('\n', 1)  # Split into command and description
+            if len(lines) == 2:
+                command, description = lines
+                # Format command with bold and add field to embed
+                embed.add_field(name=f"**{command.strip()}**", value=description.strip(), inline=False)
 
-        # Send the embed message
-        await message.channel.send(embed=embed)
+    # Send the embed message
+    await message.channel.send(embed=embed)
 
 
-    # if message.content.lower().strip() == "-a help":
-    #     if message.author.id != 223689629990125569:
-    #         return
+# if message.content.lower().strip() == "-a help":
+#     if message.author.id != 223689629990125569:
+#         return
 
-    #     with open("admin_command_help.txt", "r", encoding="utf-8") as f:
-    #         help_text = f.read()
+#     with open("admin_command_help.txt", "r", encoding="utf-8") as f:
+#         help_text = f.read()
 
-    #     await message.channel.send(help_text)
+#     await message.channel.send(help_text)
 
 
 # function to fetch time for a specific user from user_timezone_mapping
@@ -923,19 +1121,12 @@ async def handle_time_command(message):
             username, city_abbreviation = user_data
 
             # Find the city, timezone, and GMT offset
-            for country, cities in timezones_dict.items():
-                for city, abbreviation, timezone, gmt_offset in cities:
-                    if city_abbreviation == abbreviation:
-                        tz = pytz.timezone(timezone)
-                        city_time = datetime.now(tz)
-                        formatted_time = city_time.strftime('%I:%M %p')
-                        responses.append(
-                            f"It's **{formatted_time}** for **{username}**, in {city.title()}, {country.title()}, {gmt_offset}."
-                        )
-                        break
-                else:
-                    continue
-                break
+            entry = tz_index.abbreviation(city_abbreviation)
+            if entry:
+                formatted_time = datetime.now(entry.tzinfo).strftime('%I:%M %p')
+                responses.append(
+                    f"It's **{formatted_time}** for **{username}**, in {entry.city.title()}, {entry.country.title()}, {entry.gmt_offset}."
+                )
             else:
                 responses.append(f"City abbreviation `{city_abbreviation}` for **{username}** not found in timezones.")
 
@@ -982,14 +1173,8 @@ async def handle_timec_command(message):
 
                     if converted_times:
                         # Retrieve full city names for both users
-                        from_city_name = next(
-                            (city.title() for country, cities in timezones_dict.items() for city, abbreviation, _, _ in cities if abbreviation == from_city_abbreviation),
-                            from_city_abbreviation.upper()
-                        )
-                        to_city_name = next(
-                            (city.title() for country, cities in timezones_dict.items() for city, abbreviation, _, _ in cities if abbreviation == to_city_abbreviation),
-                            to_city_abbreviation.upper()
-                        )
+                        from_entry = tz_index.abbreviation(from_city_abbreviation)
+                        from_city_name = from_entry.city.title() if from_entry else from_city_abbreviation.upper()
 
                         # Correct response formatting (no city repeated)
                         response = f"{time_str} for **{from_username}** in {from_city_name}, is "
@@ -1049,7 +1234,11 @@ async def handle_conversion(message, full_response):
         # Convert amount to float
         amount = float(amount)
         
-        rate, high_30, low_30, average_30, change_30, url = get_exchange_rate(from_currency, to_currency)
+        # full responses still need the 30 day stats from the pair's own page
+        if full_response:
+            rate, high_30, low_30, average_30, change_30, url = await get_exchange_rate(from_currency, to_currency)
+        else:
+            rate = await fx_matrix.get_rate(from_currency, to_currency)
 
         if rate:
             converted_amount = amount * rate
@@ -1095,14 +1284,123 @@ async def send_error(error_message, original_message):
 # async def active_command(interaction: discord.Interaction):
 #     await interaction.response.send_message("Good job, you've executed a useless command.")
 
+# paginated embed for bulk weather, one field per distinct location
+class WeatherPageView(discord.ui.View):
+    def __init__(self, fields, title, per_page=10, page_chars=5000):
+        super().__init__()
+        # a whole embed caps at 6000 characters, so long fields get pages of their own
+        self.pages = [[]]
+        for name, value in fields:
+            page = self.pages[-1]
+            if page and (len(page) >= per_page or sum(len(n) + len(v) for n, v in page) + len(name) + len(value) > page_chars):
+                self.pages.append([])
+            self.pages[-1].append((name, value))
+        self.title = title
+        self.page = 0
+
+    def build_embed(self):
+        embed = discord.Embed(
+            title=self.title,
+            description=f"Page **{self.page + 1} / {len(self.pages)}**",
+            color=discord.Color.blue()
+        )
+        for name, value in self.pages[self.page]:
+            embed.add_field(name=name, value=value, inline=False)
+        return embed
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page > 0:
+            self.page -= 1
+            await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page < len(self.pages) - 1:
+            self.page += 1
+            await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+
+# bolded names for one location, cut short with "…and N more" once they'd pass `limit` characters
+def join_usernames(usernames, limit):
+    joined = ""
+    for i, name in enumerate(usernames):
+        candidate = f"{joined}, **{name}**" if joined else f"**{name}**"
+        left = len(usernames) - i - 1
+        # keep room for the "…and N more" we'd need if the next name doesn't fit
+        if len(candidate) + (len(f" …and {left} more") if left else 0) > limit:
+            return f"{joined} …and {left + 1} more".lstrip()
+        joined = candidate
+    return joined
+
+
+# bulk weather for everyone in USER_LOCATION_MAPPING, a role, or several mentioned users
+async def send_bulk_weather(interaction, user_or_location):
+    if user_or_location.lower() == "everyone":
+        uids = list(USER_LOCATION_MAPPING)
+    else:
+        uids = re.findall(r"<@!?(\d+)>", user_or_location)
+        for role_id in re.findall(r"<@&(\d+)>", user_or_location):
+            role = interaction.guild.get_role(int(role_id)) if interaction.guild else None
+            if role:
+                uids.extend(str(member.id) for member in role.members)
+
+    # users sharing a location share one lookup
+    users_by_location = {}
+    for uid in dict.fromkeys(uids):
+        if uid in USER_LOCATION_MAPPING:
+            username, location = USER_LOCATION_MAPPING[uid]
+            users_by_location.setdefault(normalize_location(location), []).append(username)
+
+    if not users_by_location:
+        await interaction.followup.send("None of those users have a location in the database.")
+        return
+
+    start = time.perf_counter()
+    results = await weather_client.fetch_many(list(users_by_location))
+    elapsed = time.perf_counter() - start
+
+    fields = []
+    for location, usernames in users_by_location.items():
+        weather, error = results[location]
+        if error:
+            name, summary = location.title(), f": {error}"
+        else:
+            name = f"{weather['location_name']}, {weather['country']}"
+            summary = (f": **{weather['condition']}**, **{weather['temperature']} °C** "
+                       f"(high {weather['temp_max']} °C, low {weather['temp_min']} °C)")
+        # embed field values cap at 1024 characters
+        summary = summary[:200]
+        fields.append((name, join_usernames(usernames, 1024 - len(summary)) + summary))
+
+    user_count = sum(len(usernames) for usernames in users_by_location.values())
+    view = WeatherPageView(fields, f"Weather for {user_count} users in {len(fields)} locations")
+    embed = view.build_embed()
+    embed.set_footer(text=f"Fetched in {elapsed:.2f}s")
+    await interaction.followup.send(embed=embed, view=view)
+
+
 #weather_command
 @tree.command(name="weather", description="Get the current weather for a user or location")
-@app_commands.describe(user_or_location="@user, city, country or abbreviation")
+@app_commands.describe(user_or_location="@user, city, country or abbreviation — or 'everyone', a @role, or several @users")
 async def weather_command(interaction: discord.Interaction, user_or_location: str):
     await interaction.response.defer()
 
-    # Determine if it's a user mention
     user_or_location = user_or_location.strip()
+
+    # Bulk mode: everyone, a role, or more than one user
+    if (
+        user_or_location.lower() == "everyone"
+        or "<@&" in user_or_location
+        or len(re.findall(r"<@!?\d+>", user_or_location)) > 1
+    ):
+        try:
+            await send_bulk_weather(interaction, user_or_location)
+        except Exception as e:
+            await interaction.followup.send(f"An error occurred while fetching weather data: {str(e)}")
+        return
+
+    # Determine if it's a user mention
     if user_or_location.startswith("<@") and user_or_location.endswith(">"):
         user_id = user_or_location[2:-1].replace("!", "")  # Strip <@! >
         try:
@@ -1121,37 +1419,17 @@ async def weather_command(interaction: discord.Interaction, user_or_location: st
         username = None
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # Get coordinates for location
-            geocoding_url = f"http://api.openweathermap.org/geo/1.0/direct?q={location}&limit=1&appid={WEATHER_API_KEY}"
-            async with session.get(geocoding_url) as response:
-                if response.status != 200:
-                    await interaction.followup.send("Sorry, I couldn't find that location.")
-                    return
-                
-                geocode_data = await response.json()
-                if not geocode_data:
-                    await interaction.followup.send("Sorry, I couldn't find that location.")
-                    return
-
-                lat = geocode_data[0]['lat']
-                lon = geocode_data[0]['lon']
-                location_name = geocode_data[0]['name']
-                country = geocode_data[0]['country']
-
-            # Get weather data
-            weather_url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={WEATHER_API_KEY}&units=metric"
-            async with session.get(weather_url) as response:
-                if response.status != 200:
-                    await interaction.followup.send("Sorry, I couldn't fetch the weather data.")
-                    return
-                
-                weather_data = await response.json()
-
-        temperature = round(weather_data['main']['temp'])
-        condition = weather_data['weather'][0]['description']
-        temp_max = round(weather_data['main']['temp_max'])
-        temp_min = round(weather_data['main']['temp_min'])
+        weather, error = await weather_client.fetch(location)
+        if error:
+            await interaction.followup.send(error)
+            return
+
+        location_name = weather["location_name"]
+        country = weather["country"]
+        temperature = weather["temperature"]
+        condition = weather["condition"]
+        temp_max = weather["temp_max"]
+        temp_min = weather["temp_min"]
 
         if username:
             msg = (
@@ -1170,6 +1448,11 @@ async def weather_command(interaction: discord.Interaction, user_or_location: st
         await interaction.followup.send(f"An error occurred while fetching weather data: {str(e)}")
 
 
+@weather_command.autocomplete("user_or_location")
+async def weather_location_autocomplete(interaction: discord.Interaction, current: str):
+    return location_choices(weather_completer, current)
+
+
 #convert_command
 @tree.command(name="convert", description="Convert between currencies")
 @app_commands.describe(
@@ -1187,7 +1470,7 @@ async def convert_command(interaction: discord.Interaction, amount: float, from_
         await interaction.followup.send("Unsupported currency. Use `/clist` for supported codes.")
         return
 
-    rate, *_ = get_exchange_rate(from_currency, to_currency)
+    rate = await fx_matrix.get_rate(from_currency, to_currency)
 
     if rate:
         converted = amount * rate
@@ -1215,67 +1498,120 @@ async def help_command(interaction: discord.Interaction):
 @tree.command(name="translate", description="Translate text to English")
 @app_commands.describe(text="The text you want translated")
 async def translate_command(interaction: discord.Interaction, text: str):
+    await interaction.response.defer()
     try:
-        url = f"https://translate.google.com/m?sl=auto&tl=en&q={text}"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers)
-
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            result = soup.find('div', {'class': 'result-container'})
-
-            if result:
-                await interaction.response.send_message(f"**Translation:**\n{result.text}")
-            else:
-                await interaction.response.send_message("Sorry, I couldn't translate that text.")
+        translation, error = await translator.translate(text)
+        if error:
+            await interaction.followup.send(error)
         else:
-            await interaction.response.send_message("Error accessing translation service.")
+            await interaction.followup.send(f"**Translation:**\n{translation}")
     except Exception as e:
-        await interaction.response.send_message(f"Translation error: {e}")
+        await interaction.followup.send(f"Translation error: {e}")
+
+# member lists come from the gateway member cache (members intent), sorted once per guild
+# and kept in order as people join and leave
+member_index = MemberIndex()
+member_resolver = MemberResolver()  # /whois lookups, counts cache vs REST
+metrics.REGISTRY.counter(
+    "worldwise_member_lookups_total", "Member lookups by the path that answered them", ("path",),
+    fn=lambda: {(path,): count for path, count in member_resolver.counts.items()},
+)
+MEMBER_CSV_THRESHOLD = 5000  # bigger guilds get the full list as a CSV alongside the pages
 
-#mlist_command
-@tree.command(name="mlist", description="List server members and join dates")
-async def mlist_command(interaction: discord.Interaction):
-    guild = interaction.guild
-    member_list = []
 
-    async for member in guild.fetch_members():
-        nickname = member.nick if member.nick else member.name
-        join_date = member.joined_at.strftime('%b %d, %Y') if member.joined_at else 'N/A'
-        member_list.append((nickname, join_date, member.joined_at))
+@client.event
+async def on_member_join(member):
+    member_index.add(member)
 
-    member_list.sort(key=lambda x: x[2])
-    formatted = "\n".join(f"{i+1}. {n} [{d}]" for i, (n, d, _) in enumerate(member_list))
 
-    embed = discord.Embed(
-        title="Members in this server",
-        description="Member | When they joined the server\n" + formatted,
-        color=discord.Color.dark_red()
-    )
+@client.event
+async def on_member_remove(member):
+    member_index.remove(member)
 
-    await interaction.response.send_message(embed=embed)
 
-#jdlist_command
-@tree.command(name="jdlist", description="List account creation dates of members")
-async def jdlist_command(interaction: discord.Interaction):
+@client.event
+async def on_guild_remove(guild):
+    member_index.drop(guild)
+
+
+# guild came back from an outage, joins and leaves in between never reached us
+@client.event
+async def on_guild_available(guild):
+    member_index.drop(guild)
+
+
+class MemberPageView(discord.ui.View):
+    def __init__(self, guild, entries, title, header, per_page=25):
+        super().__init__(timeout=600)
+        self.guild = guild
+        self.entries = list(entries)  # snapshot, later joins don't shift the pages under the reader
+        self.title = title
+        self.header = header
+        self.per_page = per_page
+        self.pages = max(1, -(-len(self.entries) // per_page))
+        self.page = 0
+
+    # only the visible page is rendered, names are looked up when it's shown
+    def build_embed(self):
+        start = self.page * self.per_page
+        rows = render_rows(self.guild, self.entries, start, start + self.per_page)
+        formatted = "\n".join(f"{i}. {n} [{d}]" for i, n, d in rows)
+        embed = discord.Embed(
+            title=self.title,
+            description=(self.header + "\n" if self.header else "") + formatted,
+            color=discord.Color.dark_red()
+        )
+        embed.set_footer(text=f"Page {self.page + 1} / {self.pages} | {len(self.entries):,} members")
+        return embed
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page > 0:
+            self.page -= 1
+            await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page < self.pages - 1:
+            self.page += 1
+            await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+
+async def send_member_list(interaction, order, title, header, date_column, as_csv):
     guild = interaction.guild
-    account_list = []
+    if guild is None:
+        await interaction.response.send_message("This command only works in a server.")
+        return
 
-    async for member in guild.fetch_members():
-        nickname = member.nick if member.nick else member.name
-        creation_date = member.created_at.strftime('%b %d, %Y') if member.created_at else 'N/A'
-        account_list.append((nickname, creation_date, member.created_at))
+    # chunking, building the index and the CSV can all outlast the 3 second response deadline
+    await interaction.response.defer()
+    if not guild.chunked:
+        # cache isn't filled yet, ask the gateway for the members instead of paging REST
+        await guild.chunk()
+        member_index.drop(guild)
+
+    entries = member_index.get(guild, order)
+    view = MemberPageView(guild, entries, title, header)
+    if as_csv or len(entries) > MEMBER_CSV_THRESHOLD:
+        data = await asyncio.to_thread(members_csv, guild, view.entries, date_column)
+        file = discord.File(io.BytesIO(data), filename=f"{order}_{guild.id}.csv")
+        await interaction.followup.send(embed=view.build_embed(), view=view, file=file)
+    else:
+        await interaction.followup.send(embed=view.build_embed(), view=view)
 
-    account_list.sort(key=lambda x: x[2])
-    formatted = "\n".join(f"{i + 1}. {n} [{d}]" for i, (n, d, _) in enumerate(account_list))
 
-    embed = discord.Embed(
-        title="Members' Account Creation Dates",
-        description=formatted,
-        color=discord.Color.dark_red()
-    )
+#mlist_command
+@tree.command(name="mlist", description="List server members and join dates")
+@app_commands.describe(csv="Also attach the full list as a CSV file")
+async def mlist_command(interaction: discord.Interaction, csv: bool = False):
+    await send_member_list(interaction, "joined", "Members in this server",
+                           "Member | When they joined the server", "joined_at", csv)
 
-    await interaction.response.send_message(embed=embed)
+#jdlist_command
+@tree.command(name="jdlist", description="List account creation dates of members")
+@app_commands.describe(csv="Also attach the full list as a CSV file")
+async def jdlist_command(interaction: discord.Interaction, csv: bool = False):
+    await send_member_list(interaction, "created", "Members' Account Creation Dates", "", "created_at", csv)
 
 #serverinfo_command
 @tree.command(name="serverinfo", description="Display info about this server")
@@ -1323,15 +1659,13 @@ async def time_command(interaction: discord.Interaction, user_or_location: str):
             return
 
         username, abbr = user_data
-        for country, cities in timezones_dict.items():
-            for city, abbreviation, tz_name, gmt_offset in cities:
-                if abbreviation.lower() == abbr.lower():
-                    tz = pytz.timezone(tz_name)
-                    city_time = datetime.now(tz).strftime('%I:%M %p')
-                    await interaction.response.send_message(
-                        f"It's **{city_time}** for **{username}**, in {city.title()}, {country.title()}, {gmt_offset}."
-                    )
-                    return
+        entry = tz_index.abbreviation(abbr)
+        if entry:
+            city_time = datetime.now(entry.tzinfo).strftime('%I:%M %p')
+            await interaction.response.send_message(
+                f"It's **{city_time}** for **{username}**, in {entry.city.title()}, {entry.country.title()}, {entry.gmt_offset}."
+            )
+            return
         await interaction.response.send_message(f"City abbreviation `{abbr}` not found.")
     else:
         # Fallback to standard location input
@@ -1344,21 +1678,26 @@ async def time_command(interaction: discord.Interaction, user_or_location: str):
 
 
 
+@time_command.autocomplete("user_or_location")
+async def time_location_autocomplete(interaction: discord.Interaction, current: str):
+    return location_choices(time_completer, current)
+
+
 #timeconvert_command
 @tree.command(name="timeconvert", description="Convert time between two users or locations")
 @app_commands.describe(
     time_str="Time to convert (e.g. 5pm, 17:00)",
     from_user="@User or city/abbreviation",
-    to_user="@User or city/abbreviation"
+    to_user="@User or city/abbreviation, a comma separated list of them, or 'everyone'"
 )
 async def timeconvert_command(interaction: discord.Interaction, time_str: str, from_user: str, to_user: str):
     from_input = from_user.strip()
     to_input = to_user.strip()
 
-    def extract_user_id(mention: str):
-        if mention.startswith("<@") and mention.endswith(">"):
-            return int(mention[2:-1].replace("!", ""))
-        return None
+    # Batch mode: comma separated destinations, or everyone with a saved timezone
+    if to_input.lower() == "everyone" or "," in to_input:
+        await send_batch_time_conversion(interaction, time_str, from_input, to_input)
+        return
 
     from_user_id = extract_user_id(from_input)
     to_user_id = extract_user_id(to_input)
@@ -1395,6 +1734,44 @@ async def timeconvert_command(interaction: discord.Interaction, time_str: str, f
 
 
 
+@timeconvert_command.autocomplete("from_user")
+@timeconvert_command.autocomplete("to_user")
+async def timeconvert_location_autocomplete(interaction: discord.Interaction, current: str):
+    return location_choices(time_completer, current)
+
+
+async def send_batch_time_conversion(interaction, time_str, from_input, to_input):
+    from_user_id = extract_user_id(from_input)
+    if from_user_id:
+        from_data = USER_TIMEZONE_MAPPING.get(from_user_id)
+        if not from_data:
+            await interaction.response.send_message("That user does not have timezone info saved.")
+            return
+        from_input = from_data[1]
+
+    if to_input.lower() == "everyone":
+        destinations = list(USER_TIMEZONE_MAPPING)
+    else:
+        destinations = [d.strip() for d in to_input.split(",") if d.strip()]
+
+    header, lines = convert_time_many(time_str, from_input, destinations)
+    if header is None:
+        await interaction.response.send_message("Unsupported location or timezone. Try `/tlist` for valid entries.")
+        return
+
+    # Discord caps messages at 2000 characters, so long server-wide lists get split
+    chunks = [header]
+    for line in lines:
+        if len(chunks[-1]) + len(line) + 1 > 2000:
+            chunks.append(line)
+        else:
+            chunks[-1] += "\n" + line
+
+    await interaction.response.send_message(chunks[0])
+    for chunk in chunks[1:]:
+        await interaction.followup.send(chunk)
+
+
 @tree.command(name="clist", description="List all supported currencies")
 async def clist_command(interaction: discord.Interaction):
     embed = get_currency_list_embed(SUPPORTED_CURRENCIES, CURRENCY_NAMES)
@@ -1421,10 +1798,35 @@ async def remind_command(interaction: discord.Interaction, duration: str, messag
         return
 
     seconds = int(num) * {"s": 1, "m": 60, "h": 3600}[unit]
+
+    # handed to the scheduler so it survives restarts, delivered to this channel (or DM)
+    await reminder_scheduler.add(seconds, interaction.user.id, interaction.channel_id, message)
     await interaction.response.send_message(f"Got it! I'll remind you in {duration} ⏰.")
 
-    await asyncio.sleep(seconds)
-    await interaction.followup.send(f"🔔 **Reminder**: {message}")
+
+# sends to the channel the reminder was set in, falls back to a DM
+async def deliver_reminder(user_id, channel_id, message, due):
+    await client.wait_until_ready()
+    late = time.time() - due > 60  # e.g. it came due while the bot was offline
+    note = " (sorry, this one's late)" if late else ""
+
+    channel = client.get_channel(channel_id) if channel_id else None
+    if channel:
+        try:
+            await channel.send(
+                f"🔔 **Reminder** for <@{user_id}>{note}: {message}",
+                allowed_mentions=discord.AllowedMentions(users=True, everyone=False, roles=False)
+            )
+            return
+        except discord.HTTPException:
+            pass  # fall through to a DM
+
+    user = client.get_user(user_id) or await client.fetch_user(user_id)
+    await user.send(f"🔔 **Reminder**{note}: {message}")
+
+
+REMINDERS_DB = Path("reminders.db")
+reminder_scheduler = ReminderScheduler(REMINDERS_DB, deliver_reminder)
 
 @tree.command(name="convertunit", description="Convert between basic units")
 @app_commands.describe(value="Value to convert", from_unit="Unit to convert from (km<->mi, kg<->lb, c<->f, or m2<->sqft)", to_unit="Unit to convert to (km<->mi, kg<->lb, c<->f, or m2<->sqft)")
@@ -1454,11 +1856,15 @@ async def convertunit_command(interaction: discord.Interaction, value: float, fr
 @tree.command(name="whois", description="Get info about a user")
 @app_commands.describe(user="The user to look up")
 async def whois_command(interaction: discord.Interaction, user: discord.Member):
-    user = await interaction.guild.fetch_member(user.id)
+    # cache, then the member in the command payload, REST only if neither has them
+    user = await member_resolver.resolve(interaction.guild, user)
+    if user is None:
+        await interaction.response.send_message("I couldn't find that member in this server.")
+        return
     uid = str(user.id)  # For string-based lookups (location and description)
     uid_int = user.id   # For integer-based lookups (timezone)
 
-    descriptions = load_descriptions()
+    # everything below is in memory: descriptions store, mapping dicts and the timezone index
     desc = descriptions.get(uid)
 
     embed = discord.Embed(
@@ -1468,7 +1874,7 @@ async def whois_command(interaction: discord.Interaction, user: discord.Member):
     embed.set_thumbnail(url=user.display_avatar.url)
 
     embed.add_field(name="Account Created", value=user.created_at.strftime('%b %d, %Y'), inline=True)
-    embed.add_field(name="Joined Server", value=user.joined_at.strftime('%b %d, %Y'), inline=True)
+    embed.add_field(name="Joined Server", value=user.joined_at.strftime('%b %d, %Y') if user.joined_at else "N/A", inline=True)
 
     # Roles
     roles = [r.mention for r in user.roles if r != interaction.guild.default_role]
@@ -1478,15 +1884,9 @@ async def whois_command(interaction: discord.Interaction, user: discord.Member):
     # Timezone check - use integer ID
     if uid_int in USER_TIMEZONE_MAPPING:
         username, abbr = USER_TIMEZONE_MAPPING[uid_int]
-        timezone_found = False
-        for country_cities in timezones_dict.values():
-            if timezone_found:
-                break
-            for city, short, tz, offset in country_cities:
-                if short.lower() == abbr.lower():
-                    embed.add_field(name="Timezone", value=f"{tz} ({offset})", inline=False)
-                    timezone_found = True
-                    break
+        entry = tz_index.abbreviation(abbr)
+        if entry:
+            embed.add_field(name="Timezone", value=f"{entry.timezone} ({entry.gmt_offset})", inline=False)
 
     # Location check - use string ID
     if uid in USER_LOCATION_MAPPING:
@@ -1504,11 +1904,40 @@ async def whois_command(interaction: discord.Interaction, user: discord.Member):
 @app_commands.describe(description="Your set description will show up with the /whois command")
 async def setdesc_command(interaction: discord.Interaction, description: str):
     uid = str(interaction.user.id)
-    data = load_descriptions()
-    data[uid] = description
-    save_descriptions(data)
+    descriptions.set(uid, description)
 
     await interaction.response.send_message("Your description has been saved.")
 
 
-client.run(DISCORD_TOKEN)
+async def main():
+    discord.utils.setup_logging()
+    async with client:
+        reminder_scheduler.start()
+        chat_log.start()
+        stats.start()
+        audit_log.start()
+        loop_lag_monitor.start()
+        if METRICS_PORT:
+            await metrics_server.start()
+        for command in tree.get_commands():
+            metrics.command_latency.touch(command=command.qualified_name, status="ok")
+        try:
+            await client.start(DISCORD_TOKEN)
+        finally:
+            await reminder_scheduler.stop()
+            await chat_log.stop()
+            await stats.stop()
+            await descriptions.stop()
+            await audit_log.stop()
+            search_index.close()
+            await loop_lag_monitor.stop()
+            await command_syncer.stop()
+            await fx_matrix.stop()
+            await metrics_server.stop()
+            await close_session()  # release the pooled http connections
+
+
+try:
+    asyncio.run(main())
+except KeyboardInterrupt:
+    pass
@@ -0,0 +1,106 @@
+import time
+import traceback
+
+PERMISSION_DENIED = "You do not have permission to use this command."
+
+
+# per-handler latency and error counters
+class CommandTiming:
+    __slots__ = ("calls", "errors", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms, failed):
+        self.calls += 1
+        self.errors += failed
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+# "-a <command> ..." router: the message is tokenized once and the handler is a dict lookup,
+# anything that isn't a "-a" message is rejected by the first two characters
+class CommandRouter:
+    def __init__(self, prefix, owner_id):
+        self.prefix = prefix.lower()
+        self.owner_id = owner_id
+        self.handlers = {}  # command name (one or two words) -> (handler, permission)
+        self.timings = {}
+
+    # permission: "owner" replies with a denial, "owner_silent" ignores everyone else,
+    # None leaves the check to the handler
+    def command(self, name, permission="owner"):
+        def decorator(func):
+            self.handlers[name] = (func, permission)
+            self.timings[name] = CommandTiming()
+            return func
+        return decorator
+
+    def is_command(self, content):
+        head = content[:len(self.prefix) + 1].lower()
+        return head.startswith(self.prefix) and (len(head) == len(self.prefix) or head[-1].isspace())
+
+    # returns (name, args, rest): args are the tokens after the command name,
+    # rest is the raw text after it (for commands that take free text)
+    def resolve(self, content):
+        tokens = content.split()
+        if len(tokens) < 2:
+            return None
+
+        # two-word commands ("desc list", "role list") win over their one-word prefix
+        for size in (2, 1):
+            if len(tokens) < size + 1:
+                continue
+            name = " ".join(tokens[1:size + 1]).lower()
+            if name in self.handlers:
+                rest = content.strip()
+                for token in tokens[:size + 1]:
+                    rest = rest[rest.index(token) + len(token):]
+                return name, tokens[size + 1:], rest.strip()
+        return None
+
+    # returns True when the message was a routed command
+    async def dispatch(self, message):
+        content = message.content
+        if not self.is_command(content):
+            return False
+
+        route = self.resolve(content)
+        if route is None:
+            return False
+        name, args, rest = route
+        handler, permission = self.handlers[name]
+
+        if permission and message.author.id != self.owner_id:
+            if permission == "owner":
+                await message.channel.send(PERMISSION_DENIED)
+            return True
+
+        start = time.perf_counter()
+        failed = False
+        try:
+            await handler(message, args, rest)
+        except Exception:
+            failed = True
+            traceback.print_exc()
+        finally:
+            self.timings[name].record((time.perf_counter() - start) * 1000, failed)
+        return True
+
+    def stats(self):
+        return {
+            name: {
+                "calls": timing.calls,
+                "errors": timing.errors,
+                "avg_ms": round(timing.avg_ms, 2),
+                "max_ms": round(timing.max_ms, 2),
+            }
+            for name, timing in self.timings.items()
+        }
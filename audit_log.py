@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import discord
+
+
+# slash command audit trail: invocations are queued and one sender task posts them as a
+# compact embed per window, so logging never competes with real replies for rate limits
+class AuditForwarder:
+    def __init__(self, get_channel, window=10.0, max_batch=25, max_queue=500):
+        self.get_channel = get_channel
+        self.window = window
+        self.max_batch = max_batch
+
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._task = None
+
+        self.recorded = 0
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0          # queue full, sender is backed up
+        self.failed = 0           # send raised
+        self._dropped_unreported = 0
+
+    def record(self, line):
+        try:
+            self._queue.put_nowait(line)
+            self.recorded += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._dropped_unreported += 1
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _collect(self):
+        lines = [await self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(lines) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                lines.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return lines
+
+    def build_embed(self, lines):
+        embed = discord.Embed(
+            title=f"Slash commands used ({len(lines)})",
+            description="",
+            color=discord.Color.dark_teal()
+        )
+
+        # embed descriptions cap at 4096 characters
+        for i, line in enumerate(lines):
+            if len(embed.description) + len(line) + 1 > 4000:
+                embed.description += f"\n…and {len(lines) - i} more"
+                break
+            embed.description += ("\n" if embed.description else "") + line
+
+        if self._dropped_unreported:
+            embed.set_footer(text=f"{self._dropped_unreported} invocation(s) dropped while the log channel was backed up")
+            self._dropped_unreported = 0
+        return embed
+
+    async def _run(self):
+        while True:
+            lines = await self._collect()
+            channel = self.get_channel()
+            if not channel:
+                self.failed += len(lines)  # no log channel to post to, the batch is lost
+                continue
+
+            # one send at a time: while discord.py waits out a 429 the queue fills and
+            # record() starts dropping instead of piling up sends
+            try:
+                await channel.send(embed=self.build_embed(lines))
+                self.sent += len(lines)
+                self.batches += 1
+            except discord.HTTPException:
+                self.failed += len(lines)
+            except Exception as e:
+                # anything else (bad embed, dropped connection) shouldn't kill the sender for good
+                self.failed += len(lines)
+                print(f"Failed to forward audit log batch: {e!r}")
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "recorded": self.recorded,
+            "sent": self.sent,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
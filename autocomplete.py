@@ -0,0 +1,101 @@
+from bisect import bisect_left
+from collections import Counter
+
+
+def normalize(text):
+    return " ".join(text.split()).casefold()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# prefix + trigram index for slash command autocomplete, fires on every keystroke so
+# everything is precomputed and a lookup is a bisect plus a few posting list merges
+class LocationCompleter:
+    def __init__(self, min_score=0.3):
+        self.min_score = min_score
+        self._names = []        # display label per entry
+        self._values = []       # value sent back to the command per entry
+        self._keys = []         # normalized search key per entry
+        self._seen = set()
+        self._sorted = []       # (key, entry id) sorted for prefix bisects
+        self._postings = {}     # trigram -> entry ids
+        self._trigram_counts = []
+        self._dirty = False
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key, name=None, value=None):
+        key_norm = normalize(key)
+        if not key_norm or key_norm in self._seen:
+            return
+        self._seen.add(key_norm)
+
+        entry_id = len(self._keys)
+        self._keys.append(key_norm)
+        self._names.append((name or key)[:100])
+        self._values.append((value or key)[:100])
+
+        grams = trigrams(key_norm)
+        self._trigram_counts.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+
+        self._dirty = True
+        self._cache.clear()
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def _build(self):
+        self._sorted = sorted((key, i) for i, key in enumerate(self._keys))
+        self._dirty = False
+
+    def suggest(self, query, limit=25):
+        query = normalize(query)
+        cached = self._cache.get((query, limit))
+        if cached is not None:
+            return cached
+
+        if self._dirty:
+            self._build()
+
+        ids = []
+        seen = set()
+
+        # exact prefix matches first, alphabetical
+        start = bisect_left(self._sorted, (query, -1))
+        for key, entry_id in self._sorted[start:]:
+            if not key.startswith(query) or len(ids) >= limit:
+                break
+            ids.append(entry_id)
+            seen.add(entry_id)
+
+        # then typo tolerant trigram matches, best jaccard score first
+        if len(ids) < limit and len(query) >= 3:
+            query_grams = trigrams(query)
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self._postings.get(gram, ()))
+
+            scored = []
+            for entry_id, count in shared.items():
+                if entry_id in seen:
+                    continue
+                score = count / (len(query_grams) + self._trigram_counts[entry_id] - count)
+                if score >= self.min_score:
+                    scored.append((-score, self._keys[entry_id], entry_id))
+            scored.sort()
+            ids.extend(entry_id for _, _, entry_id in scored[:limit - len(ids)])
+
+        results = [(self._names[i], self._values[i]) for i in ids]
+
+        # keystroke queries repeat a lot, keep a bounded memo of recent answers
+        if len(self._cache) >= 4096:
+            self._cache.clear()
+        self._cache[(query, limit)] = results
+        return results
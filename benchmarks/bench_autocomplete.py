@@ -0,0 +1,100 @@
+# autocomplete latency benchmark, no discord or network needed
+# run from the repo root: python benchmarks/bench_autocomplete.py
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytz
+
+from autocomplete import LocationCompleter
+
+DISCORD_DEADLINE_MS = 3000  # discord drops autocomplete responses after 3 seconds
+BUDGET_MS = 1.0  # what we actually want per keystroke
+
+
+def load_keys():
+    try:
+        from data_mappings import timezones_dict, COUNTRY_ABBREVIATIONS
+    except ImportError:
+        timezones_dict = None
+
+    keys = []
+    if timezones_dict:
+        for country, cities in timezones_dict.items():
+            keys.append(country)
+            for city, abbreviation, _, _ in cities:
+                keys.extend((city, abbreviation))
+        keys.extend(COUNTRY_ABBREVIATIONS)
+
+    # pad with every olson city name so the index is bigger than the real one
+    keys.extend(name.split("/")[-1].replace("_", " ").lower() for name in pytz.all_timezones)
+    return keys
+
+
+def typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(iterations=20000, seed=1):
+    rng = random.Random(seed)
+    keys = load_keys()
+
+    completer = LocationCompleter()
+    build_start = time.perf_counter()
+    for key in keys:
+        completer.add(key)
+    completer.suggest("")  # forces the sorted prefix table to build
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    # simulate keystrokes: growing prefixes of real keys, some with a transposed letter
+    queries = []
+    for _ in range(iterations):
+        word = rng.choice(keys)
+        if rng.random() < 0.3:
+            word = typo(word, rng)
+        queries.append(word[:rng.randint(1, len(word))])
+
+    cold = []
+    warm = []
+    for query in queries:
+        completer.clear_cache()
+        start = time.perf_counter_ns()
+        completer.suggest(query)
+        cold.append((time.perf_counter_ns() - start) / 1e6)
+
+        start = time.perf_counter_ns()
+        completer.suggest(query)
+        warm.append((time.perf_counter_ns() - start) / 1e6)
+
+    return {
+        "entries": len(completer),
+        "build_ms": round(build_ms, 3),
+        "queries": iterations,
+        "cold_p50_ms": round(percentile(cold, 50), 4),
+        "cold_p99_ms": round(percentile(cold, 99), 4),
+        "cold_max_ms": round(max(cold), 4),
+        "warm_p99_ms": round(percentile(warm, 99), 4),
+    }
+
+
+if __name__ == "__main__":
+    results = run()
+    for name, value in results.items():
+        print(f"{name:>14}: {value}")
+
+    print(f"{'budget':>14}: p99 < {BUDGET_MS}ms (discord deadline {DISCORD_DEADLINE_MS}ms)")
+    if results["cold_p99_ms"] >= BUDGET_MS:
+        print("FAIL: autocomplete p99 is over budget")
+        sys.exit(1)
+    print("OK")
@@ -0,0 +1,60 @@
+# compares the fast targeted extractors against the BeautifulSoup fallback on saved pages
+# run from the repo root: python benchmarks/bench_extract.py
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import html_extract
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+CASES = [
+    ("wise", "wise_usd-to-eur.html", html_extract.fast_wise, html_extract.soup_wise),
+    ("translate", "translate_m.html", html_extract.fast_translation, html_extract.soup_translation),
+]
+
+
+def measure(func, html, iterations):
+    func(html)  # warm up
+
+    start = time.process_time()
+    for _ in range(iterations):
+        func(html)
+    cpu_ms = (time.process_time() - start) * 1000 / iterations
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return cpu_ms, peak / 1024
+
+
+def run(iterations=50):
+    results = {}
+    for name, fixture, fast, soup in CASES:
+        html = (FIXTURES / fixture).read_text(encoding="utf-8")
+        if fast(html) != soup(html):
+            raise AssertionError(f"{name}: fast and soup extractors disagree")
+
+        fast_cpu, fast_peak = measure(fast, html, iterations)
+        soup_cpu, soup_peak = measure(soup, html, iterations)
+        results[name] = {
+            "page_kb": round(len(html) / 1024, 1),
+            "fast_cpu_ms": round(fast_cpu, 3),
+            "soup_cpu_ms": round(soup_cpu, 3),
+            "fast_peak_kb": round(fast_peak, 1),
+            "soup_peak_kb": round(soup_peak, 1),
+            "cpu_speedup": round(soup_cpu / fast_cpu, 1) if fast_cpu else None,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for name, row in run().items():
+        print(name)
+        for key, value in row.items():
+            print(f"  {key:>13}: {value}")
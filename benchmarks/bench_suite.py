@@ -0,0 +1,191 @@
+# offline micro-benchmarks for the pure hot paths, no discord login or network needed
+# run from the repo root:
+#   python benchmarks/bench_suite.py                  compare against benchmarks/baseline.json
+#   python benchmarks/bench_suite.py --save-baseline  record a new baseline on this machine
+#   python benchmarks/bench_suite.py --json out.json  also write the results somewhere
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import fx_rates
+import translate
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+TOLERANCE = 0.5  # fail when a case gets more than 50% slower, shared hosts are noisy below that
+
+
+# the bot script isn't importable (hyphenated name, starts the client at the bottom), so run
+# everything above main() in a scratch directory — that's every function and command we time
+# without the db/json files it creates at import landing in the repo
+def load_bot():
+    source = (ROOT / "Worldwise-executable.py").read_text(encoding="utf-8")
+    source = source[:source.index("async def main():")]
+    namespace = {"__name__": "worldwise_bench"}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            exec(compile(source, "Worldwise-executable.py", "exec"), namespace)
+        finally:
+            os.chdir(cwd)
+    return namespace
+
+
+# just enough of discord.Interaction for commands that only reply
+class StubResponse:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, content=None, **kwargs):
+        self.sent.append(content)
+
+
+class StubInteraction:
+    def __init__(self):
+        self.response = StubResponse()
+
+
+def measure(func, loops, repeats=7):
+    func()  # warm up
+    per_op = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        per_op.append((time.perf_counter_ns() - start) / loops)
+    return {"loops": loops, "min_ns": round(min(per_op)), "median_ns": round(statistics.median(per_op))}
+
+
+def measure_async(make_coro, loops, repeats=7):
+    async def batch():
+        for _ in range(loops):
+            await make_coro()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(make_coro())  # warm up
+        per_op = []
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            loop.run_until_complete(batch())
+            per_op.append((time.perf_counter_ns() - start) / loops)
+    finally:
+        loop.close()
+    return {"loops": loops, "min_ns": round(min(per_op)), "median_ns": round(statistics.median(per_op))}
+
+
+def parsing_cases():
+    wise_html = (FIXTURES / "wise_usd-to-eur.html").read_text(encoding="utf-8")
+    translate_html = (FIXTURES / "translate_m.html").read_text(encoding="utf-8")
+    return {
+        "parse_wise_page": lambda: measure(lambda: fx_rates.parse_wise_page(wise_html), 200),
+        "parse_translation": lambda: measure(lambda: translate.parse_translation(translate_html), 500),
+    }
+
+
+def bot_cases(bot):
+    entries = bot["tz_index"].entries
+    first, second = entries[0], entries[-1]
+    convertunit = bot["convertunit_command"].callback
+    section = bot["sections"][0]
+    now = datetime(2025, 1, 1, 17, 30)
+
+    return {
+        "get_current_time_city": lambda: measure(lambda: bot["get_current_time"](first.city), 5000),
+        "get_current_time_country": lambda: measure(lambda: bot["get_current_time"](first.country), 2000),
+        "convert_time": lambda: measure(lambda: bot["convert_time"]("5:30pm", first.city, second.city), 2000),
+        "convert_time_24h": lambda: measure(lambda: bot["convert_time"]("1730", first.city, second.country), 2000),
+        "format_time_12h": lambda: measure(lambda: bot["format_time"](now), 20000),
+        "format_time_24h": lambda: measure(lambda: bot["format_time"](now, format_12hr=False), 20000),
+        "build_embed": lambda: measure(lambda: bot["build_embed"](section), 5000),
+        "convertunit_km_mi": lambda: measure_async(lambda: convertunit(StubInteraction(), 42.0, "km", "mi"), 5000),
+        "convertunit_unsupported": lambda: measure_async(lambda: convertunit(StubInteraction(), 1.0, "km", "lb"), 5000),
+    }
+
+
+def run():
+    cases = parsing_cases()
+    skipped = {}
+    try:
+        bot = load_bot()
+    except ImportError as e:  # data_mappings/readme_content live outside the repo
+        skipped["bot"] = f"could not load the bot script: {e}"
+    else:
+        cases.update(bot_cases(bot))
+
+    results = {name: case() for name, case in cases.items()}
+    return {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+# compares min_ns (the least noisy number) case by case, returns the regressed case names
+def compare(report, baseline, tolerance=TOLERANCE):
+    regressions = []
+    for name, row in report["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            row["change"] = None
+            continue
+        change = row["min_ns"] / before["min_ns"] - 1 if before["min_ns"] else 0.0
+        row["change"] = round(change, 3)
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for the bot's hot paths")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the results to {BASELINE.name}")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--json", type=Path, help="write machine-readable results to this file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, 0.5 = 50%%")
+    args = parser.parse_args()
+
+    report = run()
+    regressions = []
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        report["baseline"] = {"created": baseline.get("created"), "tolerance": args.tolerance, "regressions": regressions}
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    for name, row in report["results"].items():
+        change = row.get("change")
+        change_text = f"{change:+.1%}" if change is not None else ""
+        print(f"{name:>26}: {row['min_ns'] / 1000:10.2f}us min {row['median_ns'] / 1000:10.2f}us median {change_text}")
+    for name, reason in report["skipped"].items():
+        print(f"{name:>26}: skipped, {reason}")
+
+    if args.save_baseline:
+        print(f"Saved baseline to {args.baseline}")
+    elif not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, run with --save-baseline to record one")
+    elif regressions:
+        print(f"FAIL: slower than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    else:
+        print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+
+# counters live in memory, bot_stats.json is written atomically (temp file + rename)
+# every `interval` seconds when something changed, and once more on shutdown
+class StatsSnapshotter:
+    def __init__(self, path="bot_stats.json", interval=30, guild_count=None):
+        self.path = Path(path)
+        self.interval = interval
+        self.guild_count = guild_count or (lambda: 0)
+
+        self.day = date.today()
+        self.commands_today = 0
+        self.active_users = set()
+
+        self._dirty = True
+        self._task = None
+
+    def _rollover(self):
+        today = date.today()
+        if today != self.day:
+            self.day = today
+            self.commands_today = 0
+            self.active_users.clear()
+            self._dirty = True
+
+    def record_message(self, author):
+        self._rollover()
+        self.commands_today += 1
+        self.active_users.add(str(author))
+        self._dirty = True
+
+    def snapshot(self):
+        self._rollover()
+        return {
+            "guilds": self.guild_count(),
+            "commands_today": self.commands_today,
+            "active_users": len(self.active_users),
+            "day": self.day.isoformat(),
+            "updated": datetime.now().isoformat()
+        }
+
+    def _write(self, data):
+        directory = self.path.parent
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)  # readers only ever see the old or the new file
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, self.snapshot())
+        except OSError as e:
+            self._dirty = True
+            print(f"Failed to write {self.path}: {e}")
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._dirty = True
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self._rollover()
+            await self.flush()
@@ -0,0 +1,345 @@
+import asyncio
+import gzip
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import discord
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024  # discord's smallest upload limit
+UPLOAD_HEADROOM = 256 * 1024  # multipart overhead, parts stay this far under the limit
+
+
+def format_text(msg):
+    timestamp = msg.created_at.strftime("%Y-%m-%d %H:%M:%S")
+    author_name = getattr(msg.author, "display_name", None) or msg.author.name
+    content = msg.content.replace('\n', ' ')
+    return f"[{timestamp}] {author_name}: {content}\n"
+
+
+def format_jsonl(msg):
+    return json.dumps({
+        "id": msg.id,
+        "timestamp": msg.created_at.isoformat(),
+        "author_id": msg.author.id,
+        "author": getattr(msg.author, "display_name", None) or msg.author.name,
+        "content": msg.content,
+        "attachments": [attachment.url for attachment in msg.attachments],
+    }, ensure_ascii=False) + "\n"
+
+
+FORMATS = {"txt": format_text, "jsonl": format_jsonl}
+
+
+# biggest part we can still upload back into the channel's guild
+def upload_chunk_bytes(channel):
+    guild = getattr(channel, "guild", None)
+    limit = guild.filesize_limit if guild else DEFAULT_CHUNK_BYTES
+    return max(limit - UPLOAD_HEADROOM, 1024 * 1024)
+
+
+def safe_name(name):
+    return re.sub(r"[^\w\-]+", "_", name).strip("_") or "channel"
+
+
+# streams a channel's history to disk in batches, never holding more than one batch in memory.
+# output is split into numbered parts small enough to upload, and a checkpoint with the last
+# written message id is saved after every batch so a crashed export resumes with after=
+class ChannelExporter:
+    def __init__(self, channel, output_dir="downloaded_chats", fmt="txt", compress=False,
+                 chunk_bytes=DEFAULT_CHUNK_BYTES, batch_size=500):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}")
+        self.channel = channel
+        self.output_dir = Path(output_dir)
+        self.fmt = fmt
+        self.compress = compress
+        # parts are sized by uncompressed bytes, so gzipped parts always fit too
+        self.chunk_bytes = chunk_bytes
+        self.batch_size = batch_size
+
+        self.checkpoint_path = self.output_dir / f"{channel.id}.checkpoint.json"
+        self.state = None
+        self.resumed = False
+
+    def _new_state(self):
+        return {
+            "channel_id": self.channel.id,
+            "channel_name": self.channel.name,
+            "format": self.fmt,
+            "compress": self.compress,
+            "last_message_id": None,
+            "messages": 0,
+            "parts": [],
+            "part_bytes": 0,  # uncompressed bytes in the last part
+            "part_size": 0,  # on-disk size of the last part at the checkpoint
+            "complete": False,
+        }
+
+    def _part_suffix(self):
+        return f".{self.fmt}" + (".gz" if self.compress else "")
+
+    # parts are keyed by channel id like the checkpoint, channels often share a name ("general",
+    # forum threads) and they all write into the same directory
+    def _part_name(self, number):
+        return f"{safe_name(self.channel.name)}_{self.channel.id}_history-{number:03d}{self._part_suffix()}"
+
+    def _part_pattern(self):
+        # any name before the id, so parts written before a rename are still ours
+        return re.compile(r".*" + re.escape(f"_{self.channel.id}_history-") + r"(\d+)" + re.escape(self._part_suffix()) + "$")
+
+    # every part of this export on disk, checkpointed or not, as {number: path}
+    def _parts_on_disk(self):
+        pattern = self._part_pattern()
+        parts = {}
+        for path in self.output_dir.glob(f"*_{self.channel.id}_history-*"):
+            match = pattern.match(path.name)
+            if match:
+                parts[int(match.group(1))] = path
+        return parts
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("format") != self.fmt or state.get("compress") != self.compress:
+            return None
+        # checkpoints from before parts carried the channel id may point at another channel's data
+        pattern = self._part_pattern()
+        if not all(pattern.match(name) for name in state.get("parts", [])):
+            return None
+        return state
+
+    def _save_checkpoint(self):
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.checkpoint_path.name}.", suffix=".tmp", dir=self.output_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.checkpoint_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _discard(self):
+        for path in self._parts_on_disk().values():
+            path.unlink(missing_ok=True)
+
+    # update=True also picks up a finished export, appending whatever was posted since
+    def _prepare(self, fresh, update=False):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        state = self.load_checkpoint()
+        if state and (update or not state["complete"]) and not fresh:
+            state["complete"] = False
+            # drop anything written after the last checkpoint, it gets fetched again
+            try:
+                if state["parts"]:
+                    with open(self.output_dir / state["parts"][-1], "r+b") as f:
+                        f.truncate(state["part_size"])
+                # and any part the crashed run rolled over to after that
+                for number, path in self._parts_on_disk().items():
+                    if number > len(state["parts"]):
+                        path.unlink(missing_ok=True)
+                return state, True
+            except FileNotFoundError:
+                pass  # parts were deleted by hand, start over
+
+        self._discard()
+        return self._new_state(), False
+
+    # appends one batch, rolling over to a new part when the current one would outgrow a chunk.
+    # each append is its own gzip member when compressing, concatenated members are valid gzip
+    def _write_batch(self, lines):
+        state = self.state
+        pending = []
+        pending_bytes = 0
+        new_part = False
+
+        def flush_pending():
+            nonlocal new_part
+            if not pending:
+                return
+            path = self.output_dir / state["parts"][-1]
+            data = "".join(pending).encode("utf-8")
+            opener = gzip.open if self.compress else open
+            # a part we just rolled over to starts empty, whatever was left at that name goes
+            with opener(path, "wb" if new_part else "ab") as f:
+                f.write(data)
+            pending.clear()
+            new_part = False
+
+        for line in lines:
+            size = len(line.encode("utf-8"))
+            if not state["parts"] or (state["part_bytes"] + pending_bytes + size > self.chunk_bytes
+                                      and state["part_bytes"] + pending_bytes > 0):
+                flush_pending()
+                state["parts"].append(self._part_name(len(state["parts"]) + 1))
+                state["part_bytes"] = 0
+                pending_bytes = 0
+                new_part = True
+            pending.append(line)
+            pending_bytes += size
+            state["part_bytes"] += size
+        flush_pending()
+
+        state["part_size"] = (self.output_dir / state["parts"][-1]).stat().st_size
+
+    # progress(count) is awaited after every batch. returns the final checkpoint state
+    async def run(self, progress=None, fresh=False, update=False):
+        self.state, self.resumed = await asyncio.to_thread(self._prepare, fresh, update)
+        formatter = FORMATS[self.fmt]
+        after = discord.Object(id=self.state["last_message_id"]) if self.state["last_message_id"] else None
+
+        batch = []
+        last_id = None
+
+        async def commit():
+            await asyncio.to_thread(self._write_batch, batch)
+            self.state["messages"] += len(batch)
+            self.state["last_message_id"] = last_id
+            await asyncio.to_thread(self._save_checkpoint)
+            batch.clear()
+            if progress:
+                await progress(self.state["messages"])
+
+        async for msg in self.channel.history(limit=None, oldest_first=True, after=after):
+            try:
+                batch.append(formatter(msg))
+            except Exception as e:
+                print(f"Error processing message: {e}")
+            last_id = msg.id
+            if len(batch) >= self.batch_size:
+                await commit()
+
+        if batch:
+            await commit()
+        self.state["complete"] = True
+        await asyncio.to_thread(self._save_checkpoint)
+        return self.state
+
+    def part_paths(self):
+        return [self.output_dir / name for name in self.state["parts"]]
+
+
+def _readable(channel, member):
+    permissions = channel.permissions_for(member)
+    return permissions.view_channel and permissions.read_message_history
+
+
+# every text channel and thread (active and public archived) the bot can read
+async def archivable_channels(guild):
+    me = guild.me
+    channels = [channel for channel in guild.text_channels if _readable(channel, me)]
+    threads = {thread.id: thread for thread in guild.threads if _readable(thread, me)}
+
+    for parent in channels + [forum for forum in guild.forums if _readable(forum, me)]:
+        try:
+            async for thread in parent.archived_threads(limit=None):
+                threads.setdefault(thread.id, thread)
+        except discord.HTTPException as e:
+            print(f"Could not list archived threads in #{parent.name}: {e}")
+    return channels + list(threads.values())
+
+
+# archives a whole guild: one ChannelExporter per channel/thread, at most `concurrency` paging
+# at once. history pages are rate limited per channel route, so channels in parallel don't
+# fight over a bucket and discord.py waits out the global limit. writes manifest.json at the end
+class GuildArchiver:
+    def __init__(self, guild, output_dir="downloaded_chats", fmt="txt", compress=False,
+                 chunk_bytes=DEFAULT_CHUNK_BYTES, concurrency=4):
+        self.guild = guild
+        self.output_dir = Path(output_dir) / f"{safe_name(guild.name)}_{guild.id}"
+        self.fmt = fmt
+        self.compress = compress
+        self.chunk_bytes = chunk_bytes
+        self.concurrency = concurrency
+
+        self.channels = []
+        self.counts = {}  # channel id -> messages saved so far
+        self.results = {}
+        self.started = None
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def elapsed(self):
+        return time.monotonic() - self.started if self.started else 0.0
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.total / elapsed if elapsed else 0.0
+
+    def finished(self):
+        return len(self.results)
+
+    async def _archive(self, channel, semaphore, progress, fresh):
+        async with semaphore:
+            exporter = ChannelExporter(channel, self.output_dir, self.fmt, self.compress, self.chunk_bytes)
+            started = time.monotonic()
+            entry = {
+                "id": channel.id,
+                "name": channel.name,
+                "type": "thread" if isinstance(channel, discord.Thread) else "text",
+                "parent_id": getattr(channel, "parent_id", None),
+            }
+
+            async def channel_progress(count):
+                self.counts[channel.id] = count
+                if progress:
+                    await progress(self)
+
+            try:
+                # channels finished by an earlier run only fetch what was posted after it
+                state = await exporter.run(progress=channel_progress, fresh=fresh, update=True)
+                entry.update(messages=state["messages"], parts=state["parts"], complete=True, resumed=exporter.resumed)
+            except Exception as e:  # one unreadable channel shouldn't sink the archive
+                state = exporter.state or {}
+                entry.update(messages=state.get("messages", 0), parts=state.get("parts", []), complete=False, error=str(e))
+            self.counts[channel.id] = entry["messages"]
+            entry["seconds"] = round(time.monotonic() - started, 2)
+            self.results[channel.id] = entry
+            if progress:
+                await progress(self)
+
+    def _write_manifest(self, manifest):
+        path = self.output_dir / "manifest.json"
+        fd, tmp_path = tempfile.mkstemp(prefix=".manifest.json.", suffix=".tmp", dir=self.output_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    # progress(archiver) is awaited whenever a channel saves a batch or finishes.
+    # returns the path of the manifest
+    async def run(self, progress=None, fresh=False):
+        self.started = time.monotonic()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.channels = await archivable_channels(self.guild)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._archive(channel, semaphore, progress, fresh) for channel in self.channels))
+
+        manifest = {
+            "guild_id": self.guild.id,
+            "guild_name": self.guild.name,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "format": self.fmt,
+            "compress": self.compress,
+            "channels": [self.results[channel.id] for channel in self.channels],
+            "messages": self.total,
+            "seconds": round(self.elapsed(), 2),
+            "messages_per_second": round(self.rate(), 1),
+        }
+        return await asyncio.to_thread(self._write_manifest, manifest)
@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+_STOP = object()  # queued by stop(), _run writes the batch it has and returns when it sees it
+
+
+# queue-backed chat log writer: on_message only does a put_nowait, a background task
+# batches lines and appends them off the event loop, rotating + gzipping old segments
+class ChatLogWriter:
+    def __init__(self, path="chat_logs.txt", archive_dir="chat_logs_archive", flush_lines=200,
+                 flush_interval=2.0, max_bytes=10 * 1024 * 1024, keep_segments=20, max_queue=20000):
+        self.path = Path(path)
+        self.archive_dir = Path(archive_dir)
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.keep_segments = keep_segments
+
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._task = None
+        self._stopping = False
+
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.rotations = 0
+
+    def write(self, line):
+        # never blocks the gateway handler, if the disk can't keep up we drop and count it
+        try:
+            self._queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def start(self):
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # let the writer finish the batch it's holding instead of cancelling it mid-write
+        if self._task:
+            if not self._task.done():
+                await self._queue.put(_STOP)
+                await self._task
+            self._task = None
+
+        # flush whatever is still queued
+        while lines := self._drain([]):
+            await asyncio.to_thread(self._write_batch, lines)
+
+    def _drain(self, lines):
+        while len(lines) < self.flush_lines:
+            try:
+                line = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if line is _STOP:
+                self._stopping = True
+                break
+            lines.append(line)
+        return lines
+
+    async def _run(self):
+        while not self._stopping:
+            line = await self._queue.get()
+            if line is _STOP:
+                return
+            lines = [line]
+            deadline = time.monotonic() + self.flush_interval
+
+            # keep collecting until the batch is full or the interval is up
+            while len(lines) < self.flush_lines and not self._stopping:
+                self._drain(lines)
+                remaining = deadline - time.monotonic()
+                if len(lines) >= self.flush_lines or remaining <= 0 or self._stopping:
+                    break
+                try:
+                    line = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if line is _STOP:
+                    self._stopping = True
+                    break
+                lines.append(line)
+
+            try:
+                await asyncio.to_thread(self._write_batch, lines)
+            except OSError as e:
+                self.dropped += len(lines)
+                print(f"Failed to write chat log batch: {e}")
+
+    def _write_batch(self, lines):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(line if line.endswith("\n") else line + "\n" for line in lines))
+            size = f.tell()
+
+        self.written += len(lines)
+        self.flushes += 1
+
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        segment = self.archive_dir / f"{self.path.stem}-{stamp}{self.path.suffix}"
+
+        os.replace(self.path, segment)
+        with open(segment, "rb") as src, gzip.open(f"{segment}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        segment.unlink()
+        self.rotations += 1
+
+        # only keep the newest segments
+        segments = sorted(self.archive_dir.glob(f"{self.path.stem}-*{self.path.suffix}.gz"))
+        for old in segments[:-self.keep_segments] if self.keep_segments else []:
+            old.unlink()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "rotations": self.rotations,
+        }
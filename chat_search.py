@@ -0,0 +1,321 @@
+import asyncio
+import gzip
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+CHAT_LOG_LINE = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] \[(.*)#([^#\]]*)\] (.*?): (.*)$")
+EXPORT_LINE = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (.*?): (.*)$")
+# <channel>[_<channel id>]_history[-NNN].txt|jsonl[.gz], parts written before the id was added have none
+EXPORT_NAME = re.compile(r"^(.*?)(?:_\d{15,})?_history(?:-\d+)?\.(txt|jsonl)(\.gz)?$")
+TAIL_BYTES = 64  # bytes before the offset we remember, to notice a file rewritten under us
+INSERT_CHUNK = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    inode INTEGER,
+    offset INTEGER NOT NULL DEFAULT 0,
+    tail BLOB,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    ts TEXT,
+    guild TEXT,
+    channel TEXT,
+    author TEXT COLLATE NOCASE,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_ts ON messages (ts);
+CREATE INDEX IF NOT EXISTS messages_author_ts ON messages (author, ts);
+CREATE INDEX IF NOT EXISTS messages_source ON messages (source_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id');
+"""
+
+
+def parse_chat_log_line(line, previous):
+    match = CHAT_LOG_LINE.match(line)
+    if match:
+        ts, guild, channel, author, content = match.groups()
+        return {"ts": ts, "guild": guild, "channel": channel, "author": author, "content": content}
+    # message text with newlines spills onto extra lines, keep them with their message
+    if previous:
+        return dict(previous, content=line)
+    return {"ts": None, "guild": None, "channel": None, "author": None, "content": line}
+
+
+def export_line_parser(path, guild):
+    name_match = EXPORT_NAME.match(path.name)
+    channel = name_match.group(1) if name_match else path.stem
+    is_jsonl = bool(name_match) and name_match.group(2) == "jsonl"
+
+    def parse(line, previous):
+        if is_jsonl:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                return None
+            ts = row.get("timestamp")
+            if ts:
+                ts = datetime.fromisoformat(ts).astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            return {"ts": ts, "guild": guild, "channel": channel, "author": row.get("author"),
+                    "content": row.get("content") or ""}
+
+        match = EXPORT_LINE.match(line)
+        if not match:
+            return dict(previous, content=line) if previous else None
+        ts, author, content = match.groups()
+        return {"ts": ts, "guild": guild, "channel": channel, "author": author, "content": content}
+    return parse
+
+
+# incremental full-text index over chat_logs.txt (plus its rotated gzip segments) and the
+# -a dl exports. every source remembers how many bytes it has consumed, so a re-index
+# only reads what was appended since the last one
+class ChatSearchIndex:
+    def __init__(self, db_path, chat_log_path="chat_logs.txt", archive_dir="chat_logs_archive",
+                 download_dir="downloaded_chats"):
+        self.db_path = str(db_path)
+        self.chat_log_path = Path(chat_log_path)
+        self.archive_dir = Path(archive_dir)
+        self.download_dir = Path(download_dir)
+
+        self._lock = threading.Lock()
+        self._update_lock = asyncio.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+        self.last_update_seconds = None
+        self.last_update_lines = 0
+        self.last_update_skipped = 0  # export files we couldn't read this time, retried next update
+
+    # --- sources ---
+
+    def _source(self, path):
+        row = self._db.execute("SELECT id, inode, offset, tail, complete FROM sources WHERE path = ?", (str(path),)).fetchone()
+        if row:
+            return {"id": row[0], "inode": row[1], "offset": row[2], "tail": row[3], "complete": row[4]}
+        cursor = self._db.execute("INSERT INTO sources (path) VALUES (?)", (str(path),))
+        return {"id": cursor.lastrowid, "inode": None, "offset": 0, "tail": None, "complete": 0}
+
+    def _save_source(self, source):
+        self._db.execute(
+            "UPDATE sources SET inode = ?, offset = ?, tail = ?, complete = ? WHERE id = ?",
+            (source["inode"], source["offset"], source["tail"], source["complete"], source["id"]),
+        )
+
+    def _forget(self, source):
+        # external-content fts rows have to be deleted with their old values
+        self._db.execute(
+            "INSERT INTO messages_fts (messages_fts, rowid, content) "
+            "SELECT 'delete', id, content FROM messages WHERE source_id = ?",
+            (source["id"],),
+        )
+        self._db.execute("DELETE FROM messages WHERE source_id = ?", (source["id"],))
+        source.update(offset=0, tail=None, complete=0)
+
+    # --- reading ---
+
+    @staticmethod
+    def _open(path):
+        return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+    def _still_matches(self, path, source):
+        # the bytes just before our offset must still be the ones we saw last time
+        if not source["offset"]:
+            return True
+        if not source["tail"]:
+            return True
+        with self._open(path) as f:
+            f.seek(source["offset"] - len(source["tail"]))
+            return f.read(len(source["tail"])) == source["tail"]
+
+    def _ingest(self, path, source, parse, start):
+        inserted = 0
+        rows = []
+        previous = None
+        offset = start
+
+        def flush():
+            nonlocal inserted
+            if not rows:
+                return
+            last_id = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+            self._db.executemany(
+                "INSERT INTO messages (source_id, offset, ts, guild, channel, author, content) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(source["id"], row["offset"], row["ts"], row["guild"], row["channel"], row["author"], row["content"])
+                 for row in rows],
+            )
+            self._db.execute("INSERT INTO messages_fts (rowid, content) SELECT id, content FROM messages WHERE id > ?", (last_id,))
+            inserted += len(rows)
+            rows.clear()
+
+        with self._open(path) as f:
+            f.seek(start)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # half-written line, picked up next time
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                line_offset = offset
+                offset += len(raw)
+                if not line.strip():
+                    continue
+                parsed = parse(line, previous)
+                if parsed is None:
+                    continue
+                previous = parsed
+                rows.append(dict(parsed, offset=line_offset))
+                if len(rows) >= INSERT_CHUNK:
+                    flush()
+            flush()
+
+            if offset:
+                f.seek(max(0, offset - TAIL_BYTES))
+                source["tail"] = f.read(offset - max(0, offset - TAIL_BYTES))
+        source["offset"] = offset
+        return inserted
+
+    def _index_chat_log(self):
+        inserted = 0
+        live = self._source(self.chat_log_path)
+        try:
+            stat = self.chat_log_path.stat()
+        except FileNotFoundError:
+            stat = None
+        rotated = live["inode"] is not None and (stat is None or stat.st_ino != live["inode"] or stat.st_size < live["offset"])
+
+        # the oldest segment we haven't seen is the file we were reading last time, so carry on
+        # from where we stopped in it. anything newer is read from the top
+        carry = live["offset"] if rotated else 0
+        stem, suffix = self.chat_log_path.stem, self.chat_log_path.suffix
+        for segment in sorted(self.archive_dir.glob(f"{stem}-*{suffix}.gz")):
+            source = self._source(segment)
+            if source["complete"]:
+                continue
+            inserted += self._ingest(segment, source, parse_chat_log_line, carry if not source["offset"] else source["offset"])
+            carry = 0
+            source["complete"] = 1
+            self._save_source(source)
+
+        if rotated and carry:
+            return inserted  # rotated but its segment isn't gzipped yet, wait for it
+        if rotated:
+            live.update(offset=0, tail=None)
+        if stat is not None:
+            live["inode"] = stat.st_ino
+            inserted += self._ingest(self.chat_log_path, live, parse_chat_log_line, live["offset"])
+        self._save_source(live)
+        return inserted
+
+    def _index_downloads(self):
+        inserted = 0
+        if not self.download_dir.exists():
+            return 0
+        for path in sorted(self.download_dir.rglob("*_history*")):
+            if not EXPORT_NAME.match(path.name):
+                continue
+            # guild archives live in <guild>_<id>/ folders
+            guild = path.parent.name if path.parent != self.download_dir else None
+            # an export running right now may be writing, truncating or discarding this file.
+            # undo just this file and pick it up on the next update
+            self._db.execute("SAVEPOINT export_source")
+            try:
+                source = self._source(path)
+                size = path.stat().st_size
+                if path.suffix != ".gz" and size < source["offset"]:
+                    self._forget(source)
+                elif not self._still_matches(path, source):
+                    self._forget(source)
+                inserted += self._ingest(path, source, export_line_parser(path, guild), source["offset"])
+                self._save_source(source)
+            except (OSError, EOFError, ValueError, zlib.error) as e:
+                self._db.execute("ROLLBACK TO export_source")
+                self.last_update_skipped += 1
+                print(f"Skipping {path} for now: {e!r}")
+            self._db.execute("RELEASE export_source")
+        return inserted
+
+    def _update(self):
+        with self._lock:
+            started = time.perf_counter()
+            self.last_update_skipped = 0
+            try:
+                inserted = self._index_chat_log() + self._index_downloads()
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+            self.last_update_seconds = time.perf_counter() - started
+            self.last_update_lines = inserted
+            return inserted
+
+    # reads whatever was appended since the last call, returns how many lines were added
+    async def update(self):
+        async with self._update_lock:
+            return await asyncio.to_thread(self._update)
+
+    # --- querying ---
+
+    @staticmethod
+    def fts_query(keywords):
+        # every word has to appear, quoted so fts5 operators in user input are just text
+        return " ".join('"' + word.replace('"', '""') + '"' for word in keywords)
+
+    def _search(self, keywords, author, channel, after, before, limit):
+        conditions = []
+        params = []
+        if keywords:
+            conditions.append("messages_fts MATCH ?")
+            params.append(self.fts_query(keywords))
+        if author:
+            conditions.append("m.author = ?")
+            params.append(author)
+        if channel:
+            conditions.append("m.channel = ?")
+            params.append(channel)
+        if after:
+            conditions.append("m.ts >= ?")
+            params.append(after)
+        if before:
+            conditions.append("m.ts < ?")
+            params.append(before)
+
+        source = "messages_fts JOIN messages m ON m.id = messages_fts.rowid" if keywords else "messages m"
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (f"SELECT m.ts, m.guild, m.channel, m.author, m.content, s.path, m.offset FROM {source} "
+               f"JOIN sources s ON s.id = m.source_id {where} ORDER BY m.ts DESC LIMIT ?")
+        with self._lock:
+            started = time.perf_counter()
+            rows = self._db.execute(sql, params + [limit]).fetchall()
+            return rows, time.perf_counter() - started
+
+    # returns ([(ts, guild, channel, author, content, path, offset)], seconds), newest first.
+    # after/before are "YYYY-MM-DD" (or longer) strings compared against the line timestamps
+    async def search(self, keywords=(), author=None, channel=None, after=None, before=None, limit=20):
+        return await asyncio.to_thread(self._search, list(keywords), author, channel, after, before, limit)
+
+    def stats(self):
+        with self._lock:
+            messages = self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+            sources = self._db.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+        return {
+            "messages": messages,
+            "sources": sources,
+            "last_update_lines": self.last_update_lines,
+            "last_update_seconds": self.last_update_seconds,
+            "last_update_skipped": self.last_update_skipped,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import discord
+
+
+# sha256 of exactly what tree.sync() would upload for that scope
+def tree_signature(tree, guild=None):
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+# syncs slash commands in the background, and only when their signatures changed since the
+# last successful sync. "global" syncs everywhere, "dev" copies the global commands onto
+# dev_guild and syncs just that guild, which discord applies instantly
+class CommandSyncer:
+    def __init__(self, tree, path="command_sync.json", mode="global", dev_guild=None):
+        if mode not in ("global", "dev"):
+            raise ValueError(f"unknown sync mode {mode!r}")
+        if mode == "dev" and dev_guild is None:
+            raise ValueError("dev sync needs a guild")
+        self.tree = tree
+        self.path = Path(path)
+        self.mode = mode
+        self.dev_guild = dev_guild
+        self._task = None
+
+        self.synced = 0
+        self.skipped = 0
+        self.last_error = None
+
+    def _scope(self):
+        return f"guild:{self.dev_guild.id}" if self.mode == "dev" else "global"
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, hashes):
+        directory = self.path.parent if str(self.path.parent) else Path(".")
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(hashes, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    # returns True when commands were uploaded, False when they were already current
+    async def sync(self, force=False):
+        guild = None
+        if self.mode == "dev":
+            self.tree.copy_global_to(guild=self.dev_guild)
+            guild = self.dev_guild
+
+        scope = self._scope()
+        signature = tree_signature(self.tree, guild=guild)
+        hashes = await asyncio.to_thread(self._load)
+        if not force and hashes.get(scope) == signature:
+            self.skipped += 1
+            print(f"Slash commands unchanged ({scope}), skipping sync.")
+            return False
+
+        await self.tree.sync(guild=guild)
+        hashes[scope] = signature
+        await asyncio.to_thread(self._save, hashes)
+        self.synced += 1
+        print(f"Synced slash commands ({scope}).")
+        return True
+
+    async def _run(self):
+        try:
+            await self.sync()
+            self.last_error = None
+        except (discord.HTTPException, OSError) as e:
+            self.last_error = e
+            print(f"Slash command sync failed: {e!r}")
+
+    # safe to call from every on_ready, only one sync runs at a time
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
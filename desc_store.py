@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+IMPORTED_VERSION = 1  # sqlite user_version once user_descriptions.json has been carried over
+
+
+# original format, the whole file is rewritten on flush (but only once per batch of changes)
+class JsonDescriptionBackend:
+    def __init__(self, path="user_descriptions.json"):
+        self.path = Path(path)
+
+    def load(self):
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                return json.load(f)
+        return {}
+
+    def write(self, data, changes, cleared):
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+# one row per user, a flush only touches the users that changed
+class SqliteDescriptionBackend:
+    def __init__(self, path="user_descriptions.db", import_from="user_descriptions.json"):
+        self.path = Path(path)
+        self.import_from = Path(import_from) if import_from else None
+
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        db.execute("CREATE TABLE IF NOT EXISTS descriptions (user_id TEXT PRIMARY KEY, description TEXT NOT NULL)")
+        return db
+
+    def load(self):
+        db = self._connect()
+        try:
+            rows = db.execute("SELECT user_id, description FROM descriptions").fetchall()
+
+            # first run on sqlite, carry over the json file. user_version records that the import
+            # happened, an empty table after -a desc clear must not bring the old json back
+            if db.execute("PRAGMA user_version").fetchone()[0] < IMPORTED_VERSION:
+                if not rows and self.import_from and self.import_from.exists():
+                    with open(self.import_from, "r") as f:
+                        rows = list(json.load(f).items())
+                with db:
+                    db.executemany("INSERT OR REPLACE INTO descriptions VALUES (?, ?)", rows)
+                    db.execute(f"PRAGMA user_version = {IMPORTED_VERSION}")
+            return dict(rows)
+        finally:
+            db.close()
+
+    def write(self, data, changes, cleared):
+        db = self._connect()
+        try:
+            with db:
+                if cleared:
+                    db.execute("DELETE FROM descriptions")
+                db.executemany(
+                    "INSERT OR REPLACE INTO descriptions VALUES (?, ?)",
+                    [(uid, desc) for uid, desc in changes.items() if desc is not None]
+                )
+                db.executemany(
+                    "DELETE FROM descriptions WHERE user_id = ?",
+                    [(uid,) for uid, desc in changes.items() if desc is None]
+                )
+        finally:
+            db.close()
+
+
+# reads are served from memory, changes are written behind after `flush_delay` seconds
+# so a burst of /desc edits turns into one write
+class DescriptionStore:
+    def __init__(self, backend, flush_delay=2.0):
+        self.backend = backend
+        self.flush_delay = flush_delay
+        self._data = backend.load()
+        self._changes = {}  # uid -> new description, None for deleted
+        self._cleared = False
+        self._flush_task = None
+        self._lock = asyncio.Lock()
+
+    def get(self, uid):
+        return self._data.get(str(uid))
+
+    def all(self):
+        return dict(self._data)
+
+    def set(self, uid, description):
+        uid = str(uid)
+        self._data[uid] = description
+        self._changes[uid] = description
+        self._schedule_flush()
+
+    def delete(self, uid):
+        uid = str(uid)
+        if self._data.pop(uid, None) is not None:
+            self._changes[uid] = None
+            self._schedule_flush()
+
+    def clear(self):
+        self._data.clear()
+        self._changes.clear()
+        self._cleared = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self._changes and not self._cleared:
+                return
+            data, changes, cleared = dict(self._data), self._changes, self._cleared
+            self._changes, self._cleared = {}, False
+            try:
+                await asyncio.to_thread(self.backend.write, data, changes, cleared)
+            except (OSError, sqlite3.Error) as e:
+                # put them back so the next flush retries
+                self._changes = {**changes, **self._changes}
+                self._cleared = self._cleared or cleared
+                print(f"Failed to save descriptions: {e}")
+
+    async def stop(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
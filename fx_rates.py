@@ -0,0 +1,184 @@
+import asyncio
+import time
+
+import aiohttp
+
+from html_extract import extract_wise
+from http_session import get_session
+from singleflight import SingleFlight
+
+WISE_URL = "https://wise.com/us/currency-converter/{}-to-{}-rate?amount=1000"
+
+# concurrent lookups of the same pair share one scrape
+wise_flights = SingleFlight()
+
+
+# pure parsing, runs in a worker thread so the event loop never blocks on it
+def parse_wise_page(html):
+    return extract_wise(html)
+
+
+async def fetch_wise_page(from_currency, to_currency):
+    url = WISE_URL.format(from_currency.lower(), to_currency.lower())
+    session = await get_session()
+
+    try:
+        async with session.get(url) as response:
+            if response.status != 200:
+                print(f"Failed to retrieve page. Status code: {response.status}")
+                return None, url
+            return await response.text(), url
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Failed to retrieve page: {e!r}")
+        return None, url
+
+
+async def _scrape_exchange_rate(from_currency, to_currency):
+    html, url = await fetch_wise_page(from_currency, to_currency)
+    if html is None:
+        return None, None, None, None, None, None
+
+    rate, high_30, low_30, average_30, change_30 = await asyncio.to_thread(parse_wise_page, html)
+    return rate, high_30, low_30, average_30, change_30, url
+
+
+# web scrapper stuff to fetch conversion info, same return shape as the old blocking version
+async def get_exchange_rate(from_currency, to_currency):
+    from_currency = from_currency.upper()
+    to_currency = to_currency.upper()
+    return await wise_flights.do((from_currency, to_currency), _scrape_exchange_rate, from_currency, to_currency)
+
+
+# in-memory rate matrix: one refresh against a single base currency, every other pair
+# is derived by cross-rate math so most conversions never leave the process
+class RateMatrix:
+    def __init__(self, currencies, base="USD", ttl=900, concurrency=5, retry_delay=60):
+        self.base = base.upper()
+        self.currencies = sorted({c.upper() for c in currencies} | {self.base})
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.retry_delay = retry_delay  # first wait after a failed refresh, doubles up to ttl
+
+        self._rates = {self.base: 1.0}  # units of currency per 1 base
+        self._fetched_at = None
+        self._attempted_at = None
+        self._failed_in_a_row = 0
+        self._lock = asyncio.Lock()
+        self._task = None
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def age(self):
+        if self._fetched_at is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
+    def is_fresh(self):
+        age = self.age()
+        return age is not None and age < self.ttl
+
+    def backoff(self):
+        if not self._failed_in_a_row:
+            return 0
+        return min(self.ttl, self.retry_delay * 2 ** (self._failed_in_a_row - 1))
+
+    def can_refresh(self):
+        if self._attempted_at is None:
+            return True
+        return time.monotonic() - self._attempted_at >= self.backoff()
+
+    def cross_rate(self, from_currency, to_currency):
+        from_rate = self._rates.get(from_currency)
+        to_rate = self._rates.get(to_currency)
+        if not from_rate or not to_rate:
+            return None
+        return to_rate / from_rate
+
+    async def refresh(self):
+        async with self._lock:
+            # someone else refreshed while we were waiting on the lock, or wise just failed us
+            if self.is_fresh() or not self.can_refresh():
+                return
+            self._attempted_at = time.monotonic()
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(currency):
+                if currency == self.base:
+                    return currency, 1.0
+                async with semaphore:
+                    rate, *_ = await get_exchange_rate(self.base, currency)
+                return currency, rate
+
+            results = await asyncio.gather(*(fetch(c) for c in self.currencies))
+            fetched = {currency: rate for currency, rate in results if rate}
+
+            # keep previous rates for anything that failed this round
+            if len(fetched) > 1:
+                self._rates.update(fetched)
+                self._fetched_at = time.monotonic()
+                self._failed_in_a_row = 0
+                self.refreshes += 1
+            else:
+                self._failed_in_a_row += 1
+                self.refresh_failures += 1
+
+    # starts a refresh in the background unless one is running or we're backing off
+    def refresh_soon(self):
+        if self._task is not None and not self._task.done():
+            return
+        if self.is_fresh() or not self.can_refresh():
+            return
+        self._task = asyncio.create_task(self._refresh_quietly())
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"FX matrix refresh failed: {e!r}")
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def get_rate(self, from_currency, to_currency):
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        if from_currency == to_currency:
+            return 1.0
+
+        if self.is_fresh():
+            rate = self.cross_rate(from_currency, to_currency)
+            if rate:
+                self.hits += 1
+                return rate
+
+        # answer this pair with one scrape now, the full matrix catches up in the background
+        self.misses += 1
+        self.refresh_soon()
+        rate, *_ = await get_exchange_rate(from_currency, to_currency)
+        return rate
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        age = self.age()
+        return {
+            "base": self.base,
+            "ttl": self.ttl,
+            "currencies": len(self._rates),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "backoff_seconds": self.backoff(),
+        }
@@ -0,0 +1,168 @@
+import os
+import re
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+# "fast" jumps straight to the nodes we need and stops parsing once they're read,
+# "soup" builds the full BeautifulSoup tree like we always did. fast falls back to soup
+# whenever it can't find what it's looking for
+EXTRACTOR = os.getenv("HTML_EXTRACTOR", "fast")
+
+
+class _Done(Exception):
+    pass
+
+
+def _has_class(attrs, class_name):
+    for name, value in attrs:
+        if name == "class" and value and class_name in value.split():
+            return True
+    return False
+
+
+# text of the first <tag class="class_name"> element, nested tags included
+class _ElementText(HTMLParser):
+    def __init__(self, tag, class_name):
+        super().__init__(convert_charrefs=True)
+        self.tag = tag
+        self.class_name = class_name
+        self.depth = 0
+        self.parts = []
+        self.found = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.depth:
+            if tag == self.tag:
+                self.depth += 1
+        elif tag == self.tag and _has_class(attrs, self.class_name):
+            self.depth = 1
+            self.found = True
+
+    def handle_endtag(self, tag):
+        if self.depth and tag == self.tag:
+            self.depth -= 1
+            if not self.depth:
+                raise _Done
+
+    def handle_data(self, data):
+        if self.depth:
+            self.parts.append(data)
+
+
+# cell texts of the first `limit` <tr> rows, same rows soup.select('table tr') sees
+class _TableRows(HTMLParser):
+    def __init__(self, limit):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.rows = []
+        self.cell = None
+        self.tables = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self.tables += 1
+        elif tag == "tr" and self.tables:
+            if len(self.rows) >= self.limit:
+                raise _Done
+            self.rows.append([])
+        elif tag == "td" and self.rows:
+            self.cell = []
+
+    def handle_endtag(self, tag):
+        if tag == "td" and self.cell is not None:
+            self.rows[-1].append("".join(self.cell))
+            self.cell = None
+        elif tag == "table":
+            self.tables -= 1
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+
+def _run(parser, html, start):
+    try:
+        parser.feed(html[start:])
+        parser.close()
+    except _Done:
+        pass
+    return parser
+
+
+def find_element_text(html, tag, class_name):
+    # skip straight to each occurrence of the class name instead of parsing from the top
+    position = html.find(class_name)
+    while position != -1:
+        start = html.rfind("<", 0, position)
+        # only bother parsing when the match sits inside a <tag ...> opening tag
+        if start != -1 and html.startswith(f"<{tag}", start) and ">" not in html[start:position]:
+            parser = _run(_ElementText(tag, class_name), html, start)
+            if parser.found:
+                return "".join(parser.parts)
+        position = html.find(class_name, position + len(class_name))
+    return None
+
+
+def find_table_rows(html, limit):
+    start = html.find("<table")
+    if start == -1:
+        return []
+    return _run(_TableRows(limit), html, start).rows
+
+
+# --- wise ---
+
+def _wise_values(rate_text, rows):
+    match = re.search(r"\d+\.\d+", rate_text.strip()) if rate_text else None
+    rate = float(match.group()) if match else None
+
+    # 30-day high, low, average, and change — deprecated, wise moves this table around
+    try:
+        high_30 = float(rows[1][1])
+        low_30 = float(rows[2][1])
+        average_30 = float(rows[3][1])
+        change_30 = rows[4][1].strip()
+    except (IndexError, ValueError):
+        high_30 = low_30 = average_30 = change_30 = None
+
+    return rate, high_30, low_30, average_30, change_30
+
+
+def soup_wise(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    rate_text = soup.find('span', class_='text-success')
+    rows = [[td.text for td in tr.find_all('td')] for tr in soup.select('table tr')[:5]]
+    return _wise_values(rate_text.text if rate_text else None, rows)
+
+
+def fast_wise(html):
+    return _wise_values(find_element_text(html, "span", "text-success"), find_table_rows(html, 5))
+
+
+def extract_wise(html):
+    if EXTRACTOR == "fast":
+        values = fast_wise(html)
+        if values[0] is not None:
+            return values
+    return soup_wise(html)
+
+
+# --- google translate ---
+
+def soup_translation(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    result = soup.find('div', {'class': 'result-container'})
+    return result.text if result else None
+
+
+def fast_translation(html):
+    return find_element_text(html, "div", "result-container")
+
+
+def extract_translation(html):
+    if EXTRACTOR == "fast":
+        translation = fast_translation(html)
+        if translation is not None:
+            return translation
+    return soup_translation(html)
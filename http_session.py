@@ -0,0 +1,30 @@
+import aiohttp
+
+from metrics import upstream_trace_config
+
+# one pooled session shared by every upstream call (wise, openweathermap, translate)
+# so we stop paying for a new connection pool + dns + tls handshake per command
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5, sock_read=8)
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+_session = None
+
+
+async def get_session():
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(limit=50, limit_per_host=10, ttl_dns_cache=300)
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=DEFAULT_TIMEOUT,
+            headers=DEFAULT_HEADERS,
+            trace_configs=[upstream_trace_config()]  # upstream latency/errors for /metrics
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -0,0 +1,145 @@
+import bisect
+import csv
+import io
+from datetime import datetime, timezone
+
+import discord
+
+# members with no join date sort last
+MISSING_DATE = datetime.max.replace(tzinfo=timezone.utc)
+
+
+def _joined_key(member):
+    return (member.joined_at or MISSING_DATE, member.id)
+
+
+def _created_key(member):
+    return (member.created_at or MISSING_DATE, member.id)
+
+
+# per-guild member lists pre-sorted by join date and by account creation date, built once from
+# the gateway member cache and kept in order by on_member_join / on_member_remove
+class MemberIndex:
+    def __init__(self):
+        self._guilds = {}  # guild id -> {"joined": [(date, id)], "created": [(date, id)]}
+
+        self.builds = 0
+        self.joins = 0
+        self.leaves = 0
+
+    def _build(self, guild):
+        index = {
+            "joined": sorted(_joined_key(member) for member in guild.members),
+            "created": sorted(_created_key(member) for member in guild.members),
+        }
+        self._guilds[guild.id] = index
+        self.builds += 1
+        return index
+
+    def get(self, guild, order):
+        index = self._guilds.get(guild.id)
+        # a join or leave we never saw (missed events while disconnected) shows up as a size
+        # mismatch, only trusted once the guild is chunked and the cache has everyone
+        if index is None or (guild.chunked and guild.member_count is not None
+                                 and len(index[order]) != guild.member_count):
+            index = self._build(guild)
+        return index[order]
+
+    def add(self, member):
+        index = self._guilds.get(member.guild.id)
+        if index is None:
+            return  # built from the cache on first use, which already has them
+        for order, key in (("joined", _joined_key(member)), ("created", _created_key(member))):
+            entries = index[order]
+            position = bisect.bisect_left(entries, key)
+            if position == len(entries) or entries[position] != key:
+                entries.insert(position, key)
+        self.joins += 1
+
+    def remove(self, member):
+        index = self._guilds.get(member.guild.id)
+        if index is None:
+            return
+        for order, key in (("joined", _joined_key(member)), ("created", _created_key(member))):
+            entries = index[order]
+            position = bisect.bisect_left(entries, key)
+            if position < len(entries) and entries[position] == key:
+                del entries[position]
+        self.leaves += 1
+
+    def drop(self, guild):
+        self._guilds.pop(guild.id, None)
+
+    def clear(self):
+        self._guilds.clear()
+
+    def stats(self):
+        return {
+            "guilds": len(self._guilds),
+            "members": sum(len(index["joined"]) for index in self._guilds.values()),
+            "builds": self.builds,
+            "joins": self.joins,
+            "leaves": self.leaves,
+        }
+
+
+def member_name(guild, member_id):
+    member = guild.get_member(member_id)
+    if member is None:
+        return f"Unknown ({member_id})"
+    return member.nick if member.nick else member.name
+
+
+def format_date(date):
+    return date.strftime('%b %d, %Y') if date != MISSING_DATE else 'N/A'
+
+
+# rows are (position, name, date) for a slice of the index, names looked up only for that slice
+def render_rows(guild, entries, start, stop):
+    return [
+        (position, member_name(guild, member_id), format_date(date))
+        for position, (date, member_id) in enumerate(entries[start:stop], start=start + 1)
+    ]
+
+
+def members_csv(guild, entries, date_column):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["position", "member_id", "name", date_column])
+    for position, (date, member_id) in enumerate(entries, start=1):
+        writer.writerow([position, member_id, member_name(guild, member_id),
+                         date.isoformat() if date != MISSING_DATE else ""])
+    return buffer.getvalue().encode("utf-8")
+
+
+# finds a guild member without a REST call whenever possible: the gateway cache first, then the
+# member discord already resolved into the slash command payload, and fetch_member only when
+# neither has them. counts which path each lookup took
+class MemberResolver:
+    PATHS = ("cache", "payload", "rest", "missing")
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.PATHS, 0)
+
+    async def resolve(self, guild, user):
+        member = guild.get_member(user.id)
+        if member is not None:
+            self.counts["cache"] += 1
+            return member
+
+        if isinstance(user, discord.Member) and user.guild.id == guild.id and user.joined_at is not None:
+            self.counts["payload"] += 1
+            return user
+
+        try:
+            member = await guild.fetch_member(user.id)
+        except discord.NotFound:
+            self.counts["missing"] += 1
+            return None
+        self.counts["rest"] += 1
+        return member
+
+    def stats(self):
+        lookups = sum(self.counts.values())
+        return dict(self.counts, lookups=lookups,
+                    rest_ratio=self.counts["rest"] / lookups if lookups else 0.0)
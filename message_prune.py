@@ -0,0 +1,123 @@
+import time
+from datetime import timedelta
+
+import discord
+
+BULK_DELETE_LIMIT = 100  # discord's max per bulk delete call
+# discord refuses bulk deletes of messages older than 14 days, keep a few minutes of slack
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+
+
+# deletes every message in a channel matching `match(msg)`. messages younger than 14 days go
+# out in bulk deletes of up to 100, older ones one at a time (discord.py waits out the
+# per-route rate limit on those for us). dry_run only counts what would be deleted
+class PruneJob:
+    def __init__(self, channel, match, dry_run=False, progress_every=1000, progress_interval=5.0):
+        self.channel = channel
+        self.match = match
+        self.dry_run = dry_run
+        # scanning alone reports too, so dry runs and long stretches without matches show movement
+        self.progress_every = progress_every
+        self.progress_interval = progress_interval
+        self._reported_scanned = 0
+        self._reported_at = None
+
+        self.scanned = 0
+        self.matched = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+        self.started = None
+
+    @property
+    def deleted(self):
+        return self.bulk_deleted + self.single_deleted
+
+    def elapsed(self):
+        return time.monotonic() - self.started if self.started else 0.0
+
+    def rate(self):
+        elapsed = self.elapsed()
+        count = self.matched if self.dry_run else self.deleted
+        return count / elapsed if elapsed else 0.0
+
+    async def _delete_one(self, msg):
+        try:
+            await msg.delete()
+            self.single_deleted += 1
+        except discord.NotFound:
+            pass  # already gone
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            self.failed += 1
+            print(f"Failed to delete message {msg.id}: {e}")
+
+    async def _delete_bulk(self, batch):
+        if len(batch) == 1:
+            await self._delete_one(batch[0])
+            return
+        try:
+            await self.channel.delete_messages(batch)
+            self.bulk_deleted += len(batch)
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            # one bad message fails the whole call, retry that batch one by one
+            print(f"Bulk delete failed, falling back to single deletes: {e}")
+            for msg in batch:
+                await self._delete_one(msg)
+
+    async def _report(self, progress, force=False):
+        if not progress:
+            return
+        now = time.monotonic()
+        if (force or self.scanned - self._reported_scanned >= self.progress_every
+                or now - self._reported_at >= self.progress_interval):
+            self._reported_scanned = self.scanned
+            self._reported_at = now
+            await progress(self)
+
+    # progress(job) is awaited after every bulk batch and every single delete, and otherwise
+    # every progress_every scanned messages or progress_interval seconds, whichever comes first
+    async def run(self, progress=None):
+        self.started = self._reported_at = time.monotonic()
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        batch = []
+
+        # history is newest first, so once one message is too old for bulk delete, all the rest are
+        async for msg in self.channel.history(limit=None):
+            self.scanned += 1
+            await self._report(progress)
+            if not self.match(msg):
+                continue
+            self.matched += 1
+            if self.dry_run:
+                continue
+
+            if msg.created_at > cutoff:
+                batch.append(msg)
+                if len(batch) >= BULK_DELETE_LIMIT:
+                    await self._delete_bulk(batch)
+                    batch = []
+                    await self._report(progress, force=True)
+                continue
+
+            if batch:
+                await self._delete_bulk(batch)
+                batch = []
+            await self._delete_one(msg)
+            await self._report(progress, force=True)
+
+        if batch:
+            await self._delete_bulk(batch)
+        return self
+
+    def summary(self):
+        if self.dry_run:
+            return (f"Scanned **{self.scanned:,}** messages, **{self.matched:,}** would be deleted "
+                    f"({self.elapsed():.1f}s).")
+        failed = f", **{self.failed:,}** failed" if self.failed else ""
+        return (f"Deleted **{self.deleted:,}** of **{self.matched:,}** matches "
+                f"(**{self.bulk_deleted:,}** in bulk, **{self.single_deleted:,}** one by one{failed}) "
+                f"in {self.elapsed():.1f}s, {self.rate():.1f} msg/s.")
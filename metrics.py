@@ -0,0 +1,262 @@
+import asyncio
+import bisect
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+# seconds, roughly prometheus' defaults with a tail for slow scrapes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# upstream hosts we report on, anything else the shared session talks to is ignored
+UPSTREAM_HOSTS = {
+    "wise.com": "wise",
+    "api.openweathermap.org": "openweathermap",
+    "translate.google.com": "translate",
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=(), fn=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        # fn is read at scrape time: a number, or {label values tuple: number}
+        self.fn = fn
+        self._values = {} if labelnames or fn else {(): 0}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self):
+        if self.fn is None:
+            return sorted(self._values.items())
+        value = self.fn()
+        if isinstance(value, dict):
+            return sorted(value.items())
+        return [((), value)]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in self._samples():
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        if not self.labelnames:
+            self.touch()
+
+    # creates an empty series so the label set shows up before its first observation
+    def touch(self, **labels):
+        key = self._key(labels)
+        if key not in self._values:
+            self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        return self._values[key]
+
+    def observe(self, value, **labels):
+        series = self.touch(**labels)
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=(), fn=None):
+        return self._register(Counter(name, help_text, labelnames, fn))
+
+    def gauge(self, name, help_text, labelnames=(), fn=None):
+        return self._register(Gauge(name, help_text, labelnames, fn))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:  # one broken callback shouldn't take the whole scrape down
+                print(f"Failed to render metric {metric.name}: {e!r}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+command_latency = REGISTRY.histogram(
+    "worldwise_command_duration_seconds", "Slash command handling time", ("command", "status")
+)
+upstream_latency = REGISTRY.histogram(
+    "worldwise_upstream_request_duration_seconds", "Upstream HTTP request time", ("service",)
+)
+upstream_errors = REGISTRY.counter(
+    "worldwise_upstream_errors_total", "Upstream requests that failed or returned non-200", ("service", "reason")
+)
+loop_lag = REGISTRY.histogram(
+    "worldwise_event_loop_lag_seconds", "How late the event loop woke a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+messages_seen = REGISTRY.counter("worldwise_messages_total", "Guild text messages seen by on_message")
+
+
+# --- upstream tracing, hooked into the shared aiohttp session ---
+
+def _service(url):
+    return UPSTREAM_HOSTS.get(urlsplit(str(url)).hostname or "")
+
+
+async def _on_request_start(session, context, params):
+    context.service = _service(params.url)
+    context.started = time.perf_counter()
+
+
+async def _on_request_end(session, context, params):
+    if context.service is None:
+        return
+    upstream_latency.observe(time.perf_counter() - context.started, service=context.service)
+    if params.response.status != 200:
+        upstream_errors.inc(service=context.service, reason=f"http_{params.response.status}")
+
+
+async def _on_request_exception(session, context, params):
+    if context.service is None:
+        return
+    upstream_latency.observe(time.perf_counter() - context.started, service=context.service)
+    upstream_errors.inc(service=context.service, reason=type(params.exception).__name__)
+
+
+def upstream_trace_config():
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_request_end.append(_on_request_end)
+    trace.on_request_exception.append(_on_request_exception)
+    return trace
+
+
+# sleeps for `interval` and records how much later than asked it actually woke up
+class LoopLagMonitor:
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - started - self.interval)
+            loop_lag.observe(self.last_lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# GET /metrics in prometheus text format, bound to localhost by default
+class MetricsServer:
+    def __init__(self, registry=REGISTRY, host="127.0.0.1", port=9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def _handle(self, request):
+        return web.Response(
+            body=self.registry.render().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except OSError as e:
+            print(f"Metrics endpoint disabled, couldn't bind {self.host}:{self.port}: {e!r}")
+            await self._runner.cleanup()
+            self._runner = None
+            return
+        print(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,106 @@
+import asyncio
+import heapq
+import sqlite3
+import threading
+import time
+import traceback
+
+
+# every pending reminder lives in one min-heap of (due, id) driven by a single timer task,
+# rows are persisted in sqlite so they survive restarts and the message text stays on disk
+class ReminderScheduler:
+    def __init__(self, db_path, deliver):
+        self.db_path = str(db_path)
+        self.deliver = deliver  # async deliver(user_id, channel_id, message, due)
+        self._heap = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reminders ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "due REAL NOT NULL, "
+            "user_id INTEGER NOT NULL, "
+            "channel_id INTEGER, "
+            "message TEXT NOT NULL, "
+            "created REAL NOT NULL)"
+        )
+        self._db.commit()
+
+        self.delivered = 0
+        self.failed = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _execute(self, sql, params=()):
+        with self._db_lock:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+            return rows
+
+    def _insert(self, due, user_id, channel_id, message):
+        with self._db_lock:
+            cursor = self._db.execute(
+                "INSERT INTO reminders (due, user_id, channel_id, message, created) VALUES (?, ?, ?, ?, ?)",
+                (due, user_id, channel_id, message, time.time())
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def start(self):
+        # reload whatever was pending when we last shut down
+        self._heap = self._execute("SELECT due, id FROM reminders")
+        heapq.heapify(self._heap)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._db_lock:
+            self._db.close()
+
+    async def add(self, delay, user_id, channel_id, message):
+        due = time.time() + delay
+        reminder_id = await asyncio.to_thread(self._insert, due, user_id, channel_id, message)
+        heapq.heappush(self._heap, (due, reminder_id))
+
+        # only need to wake the timer if this one jumped the queue
+        if self._heap[0][1] == reminder_id:
+            self._wakeup.set()
+        return reminder_id
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due, reminder_id = heapq.heappop(self._heap)
+            rows = await asyncio.to_thread(
+                self._execute, "SELECT user_id, channel_id, message FROM reminders WHERE id = ?", (reminder_id,)
+            )
+            if rows:
+                user_id, channel_id, message = rows[0]
+                try:
+                    await self.deliver(user_id, channel_id, message, due)
+                    self.delivered += 1
+                except Exception:
+                    self.failed += 1
+                    traceback.print_exc()
+            await asyncio.to_thread(self._execute, "DELETE FROM reminders WHERE id = ?", (reminder_id,))
@@ -0,0 +1,35 @@
+import asyncio
+
+
+# coalesces concurrent identical upstream lookups: the first caller for a key starts
+# the fetch, everyone else who asks for the same key while it's running awaits that
+# same task and shares its result
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key, func, *args, **kwargs):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        # shield so one caller being cancelled doesn't cancel the fetch for the rest
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self):
+        return {
+            "in_flight": len(self._inflight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
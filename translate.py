@@ -0,0 +1,73 @@
+import asyncio
+from collections import OrderedDict
+
+import aiohttp
+
+from html_extract import extract_translation
+from http_session import get_session
+from singleflight import SingleFlight
+
+TRANSLATE_URL = "https://translate.google.com/m"
+
+
+# only whitespace is folded, case can change the translation ("Polish" vs "polish")
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+# pure parsing, runs in a worker thread
+def parse_translation(html):
+    return extract_translation(html)
+
+
+# async google translate scraper with a bounded LRU of recent translations
+class Translator:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self.flights = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+
+    async def _fetch(self, text, target):
+        session = await get_session()
+        params = {"sl": "auto", "tl": target, "q": text}
+        try:
+            async with session.get(TRANSLATE_URL, params=params) as response:
+                if response.status != 200:
+                    return None, "Error accessing translation service."
+                html = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None, "Error accessing translation service."
+
+        translation = await asyncio.to_thread(parse_translation, html)
+        if not translation:
+            return None, "Sorry, I couldn't translate that text."
+        return translation, None
+
+    # returns (translation, error) — error is a user-facing message
+    async def translate(self, text, target="en"):
+        key = (normalize_text(text), target)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key], None
+
+        self.misses += 1
+        translation, error = await self.flights.do(key, self._fetch, text, target)
+        if translation:
+            self._cache[key] = translation
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return translation, error
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
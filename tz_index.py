@@ -0,0 +1,109 @@
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pytz
+
+# one row of timezones_dict with its country attached and the tzinfo already resolved
+TimezoneEntry = namedtuple("TimezoneEntry", ["country", "city", "abbreviation", "timezone", "gmt_offset", "tzinfo"])
+
+
+def normalize(name):
+    return name.strip().casefold()
+
+
+# inverted index over timezones_dict, built once at startup so lookups are a dict hit
+# instead of a nested walk over every country and city
+class TimezoneIndex:
+    def __init__(self, timezones_dict):
+        self.entries = []
+        self._countries = {}      # country -> every entry in it
+        self._names = {}          # city or abbreviation -> entries, in timezones_dict order
+        self._abbreviations = {}  # abbreviation -> first entry using it
+        self._matches = {}        # country, city or abbreviation -> entries, in timezones_dict order
+        self._tzinfos = {}
+
+        # current utc offsets (minutes) for every known timezone, one slot per timezone
+        self._offsets = None
+        self._offsets_hour = None
+
+        for country, cities in timezones_dict.items():
+            country_key = normalize(country)
+            for city, abbreviation, timezone, gmt_offset in cities:
+                entry = TimezoneEntry(country, city, abbreviation, timezone, gmt_offset, self.tzinfo(timezone))
+                self.entries.append(entry)
+                self._countries.setdefault(country_key, []).append(entry)
+                self._abbreviations.setdefault(normalize(abbreviation), entry)
+
+                for key in {normalize(city), normalize(abbreviation)}:
+                    self._names.setdefault(key, []).append(entry)
+                for key in {country_key, normalize(city), normalize(abbreviation)}:
+                    self._matches.setdefault(key, []).append(entry)
+
+        self._tz_names = sorted(self._tzinfos)
+        self._tz_positions = {name: i for i, name in enumerate(self._tz_names)}
+
+    def tzinfo(self, timezone):
+        if timezone not in self._tzinfos:
+            self._tzinfos[timezone] = pytz.timezone(timezone)
+        return self._tzinfos[timezone]
+
+    # every city listed under a country key
+    def country(self, name):
+        return self._countries.get(normalize(name), [])
+
+    # first entry whose city or abbreviation matches
+    def city(self, name):
+        entries = self._names.get(normalize(name))
+        return entries[0] if entries else None
+
+    # entry for a USER_TIMEZONE_MAPPING style abbreviation
+    def abbreviation(self, name):
+        return self._abbreviations.get(normalize(name))
+
+    # every entry whose country, city or abbreviation matches
+    def find(self, name):
+        return self._matches.get(normalize(name), [])
+
+    # shared resolver for the "is this a country, otherwise a city/abbreviation" lookups
+    def resolve(self, name):
+        entries = self.country(name)
+        if entries:
+            return entries
+        entry = self.city(name)
+        return [entry] if entry else []
+
+    # offsets only move on dst transitions, so the array is rebuilt at most once an hour
+    def utc_offsets(self, now=None):
+        now = now or datetime.now(pytz.utc)
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        if self._offsets_hour != hour:
+            self._offsets = np.array(
+                [now.astimezone(self._tzinfos[name]).utcoffset().total_seconds() // 60 for name in self._tz_names],
+                dtype=np.int32
+            )
+            self._offsets_hour = hour
+        return self._offsets
+
+    # converts one wall-clock time in from_entry's timezone to every destination in a single
+    # vectorized pass, returns (entry, hour, minute, day_shift) per destination in order
+    def convert_many(self, naive_time, from_entry, to_entries):
+        if not to_entries:
+            return []
+
+        offsets = self.utc_offsets()
+        positions = np.fromiter(
+            (self._tz_positions[entry.timezone] for entry in to_entries),
+            dtype=np.intp,
+            count=len(to_entries)
+        )
+
+        source_minutes = naive_time.hour * 60 + naive_time.minute - offsets[self._tz_positions[from_entry.timezone]]
+        local_minutes = source_minutes + offsets[positions]
+        day_shifts, minutes_of_day = np.divmod(local_minutes, 1440)
+        hours, minutes = np.divmod(minutes_of_day, 60)
+
+        return [
+            (entry, int(hour), int(minute), int(day_shift))
+            for entry, hour, minute, day_shift in zip(to_entries, hours, minutes, day_shifts)
+        ]
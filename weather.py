@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+from http_session import get_session
+from singleflight import SingleFlight
+
+GEOCODING_URL = "http://api.openweathermap.org/geo/1.0/direct"
+WEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
+
+
+def normalize_location(location):
+    return " ".join(location.split()).casefold()
+
+
+# location string -> lat/lon/name/country, places don't move so entries never expire
+class GeocodeCache:
+    def __init__(self, path="geocode_cache.json"):
+        self.path = Path(path)
+        self.on_add = None  # called with (query, place) for every new entry
+        self._places = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._places = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable {self.path}: {e}")
+
+    def __len__(self):
+        return len(self._places)
+
+    def items(self):
+        return self._places.items()
+
+    def get(self, query):
+        return self._places.get(query)
+
+    async def add(self, query, place):
+        self._places[query] = place
+        if self.on_add:
+            self.on_add(query, place)
+        await asyncio.to_thread(self._save, dict(self._places))
+
+    def _save(self, places):
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(places, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            os.unlink(tmp_path)
+            print(f"Failed to save {self.path}: {e}")
+
+
+# current conditions keyed by rounded coordinates, only good for a few minutes
+class WeatherCache:
+    def __init__(self, ttl=600, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+
+    @staticmethod
+    def key(lat, lon):
+        return round(lat, 2), round(lon, 2)
+
+    def get(self, lat, lon):
+        entry = self._entries.get(self.key(lat, lon))
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, lat, lon, data):
+        if len(self._entries) >= self.max_entries:
+            now = time.monotonic()
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[self.key(lat, lon)] = (time.monotonic() + self.ttl, data)
+
+
+class WeatherClient:
+    def __init__(self, api_key, geocode_path="geocode_cache.json", ttl=600):
+        self.api_key = api_key
+        self.geocodes = GeocodeCache(geocode_path)
+        self.conditions = WeatherCache(ttl)
+        # everyone asking for "london" at once shares one round trip
+        self.flights = SingleFlight()
+
+        self.geocode_hits = 0
+        self.geocode_misses = 0
+        self.weather_hits = 0
+        self.weather_misses = 0
+
+    async def _get_json(self, url, params):
+        session = await get_session()
+        async with session.get(url, params=params) as response:
+            if response.status != 200:
+                return None
+            return await response.json()
+
+    async def geocode(self, location):
+        place = self.geocodes.get(location)
+        if place:
+            self.geocode_hits += 1
+            return place
+
+        self.geocode_misses += 1
+        geocode_data = await self._get_json(GEOCODING_URL, {"q": location, "limit": 1, "appid": self.api_key})
+        if not geocode_data:
+            return None
+
+        place = {
+            "lat": geocode_data[0]['lat'],
+            "lon": geocode_data[0]['lon'],
+            "name": geocode_data[0]['name'],
+            "country": geocode_data[0]['country'],
+        }
+        await self.geocodes.add(location, place)
+        return place
+
+    async def current(self, lat, lon):
+        weather_data = self.conditions.get(lat, lon)
+        if weather_data:
+            self.weather_hits += 1
+            return weather_data
+
+        self.weather_misses += 1
+        weather_data = await self._get_json(
+            WEATHER_URL, {"lat": lat, "lon": lon, "appid": self.api_key, "units": "metric"}
+        )
+        if weather_data:
+            self.conditions.set(lat, lon, weather_data)
+        return weather_data
+
+    async def _fetch(self, location):
+        try:
+            place = await self.geocode(location)
+            if not place:
+                return None, "Sorry, I couldn't find that location."
+
+            weather_data = await self.current(place["lat"], place["lon"])
+            if not weather_data:
+                return None, "Sorry, I couldn't fetch the weather data."
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None, "Sorry, I couldn't fetch the weather data."
+
+        return {
+            "location_name": place["name"],
+            "country": place["country"],
+            "temperature": round(weather_data['main']['temp']),
+            "condition": weather_data['weather'][0]['description'],
+            "temp_max": round(weather_data['main']['temp_max']),
+            "temp_min": round(weather_data['main']['temp_min']),
+        }, None
+
+    # returns (weather, error) — error is a user-facing message when the lookup fails
+    async def fetch(self, location):
+        location = normalize_location(location)
+        return await self.flights.do(location, self._fetch, location)
+
+    # bulk lookups: dedupes locations and fans out with at most `concurrency` in flight,
+    # returns {normalized location: (weather, error)}
+    async def fetch_many(self, locations, concurrency=8):
+        unique = list(dict.fromkeys(normalize_location(location) for location in locations))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(location):
+            async with semaphore:
+                return await self.fetch(location)
+
+        results = await asyncio.gather(*(fetch_one(location) for location in unique))
+        return dict(zip(unique, results))
+
+    def stats(self):
+        return {
+            "geocodes_cached": len(self.geocodes),
+            "geocode_hits": self.geocode_hits,
+            "geocode_misses": self.geocode_misses,
+            "weather_hits": self.weather_hits,
+            "weather_misses": self.weather_misses,
+        }